@@ -1,4 +1,4 @@
-from app.agents.base_agent import BaseAgent
+from app.agents.base_agent import BaseAgent, TokenBudget
 from app.agents.router_agent import RouterAgent
 from app.agents.support_agent import SupportAgent
 from app.agents.order_agent import OrderAgent
@@ -6,6 +6,7 @@ from app.agents.billing_agent import BillingAgent
 
 __all__ = [
     "BaseAgent",
+    "TokenBudget",
     "RouterAgent",
     "SupportAgent",
     "OrderAgent",
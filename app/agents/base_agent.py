@@ -1,14 +1,53 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+import json
+import asyncio
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools.base_tool import BaseTool
+from app.tools.tool_executor import ToolExecutor
 from app.core.ai_client import ai_client
 from app.core.config import settings
+from app.utils.context_builder import ContextWindow, build_context, count_message_tokens
+
+
+class TokenBudget:
+    """
+    Cumulative token usage of one agent turn, read from response.usage.
+    
+    Shared across every completion of the turn so the agent loop can stop
+    offering tools once the budget is spent.
+    """
+    
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit if limit is not None else settings.AGENT_TOKEN_BUDGET
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+    
+    def add(self, usage: Any) -> None:
+        """Add a completion's usage (None when the provider did not report it)"""
+        if usage is None:
+            return
+        self.prompt_tokens += usage.prompt_tokens or 0
+        self.completion_tokens += usage.completion_tokens or 0
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+    
+    @property
+    def exhausted(self) -> bool:
+        return self.total_tokens >= self.limit
+    
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens
+        }
 
 
 class BaseAgent(ABC):
@@ -20,11 +59,14 @@ class BaseAgent(ABC):
     - description: What this agent handles
     - system_prompt: Instructions for the AI
     - tools: List of tools this agent can use
+    
+    Agents hold no per-request state and are built once, by AgentRegistry.
+    Tools get their database session per call from ToolExecutor.
     """
     
-    def __init__(self, db: AsyncSession):
-        self.db = db
+    def __init__(self):
         self.ai_client = ai_client
+        self._tool_schemas: Optional[List[Dict[str, Any]]] = None
     
     @property
     @abstractmethod
@@ -49,164 +91,353 @@ class BaseAgent(ABC):
         """List of tools available to this agent"""
         pass
     
+    def get_tool_schemas(self) -> List[Dict[str, Any]]:
+        """OpenAI tool schemas of get_tools(), serialized once"""
+        if self._tool_schemas is None:
+            self._tool_schemas = [tool.to_openai_tool() for tool in self.get_tools()]
+        return self._tool_schemas
+    
+    @property
+    def max_context_messages(self) -> int:
+        """Most history messages sent with a prompt"""
+        return settings.MAX_CONTEXT_MESSAGES
+    
+    @property
+    def max_context_tokens(self) -> int:
+        """Token budget for the whole prompt: system prompt, history and message"""
+        return settings.MAX_TOKENS_PER_CONTEXT
+    
+    def _build_messages(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        summary: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], ContextWindow]:
+        """
+        Build the prompt: system prompt, conversation summary, recent history
+        and the user message.
+        
+        History gets whatever is left of max_context_tokens after the fixed
+        parts, newest messages first.
+        
+        Returns:
+            Tuple of (messages, packed history window)
+        """
+        fixed_messages = [{"role": "system", "content": self.system_prompt}]
+        if summary:
+            fixed_messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary}"
+            })
+        user_message = {"role": "user", "content": message}
+        
+        history_budget = self.max_context_tokens - sum(
+            count_message_tokens(m) for m in [*fixed_messages, user_message]
+        )
+        window = build_context(
+            conversation_history or [],
+            max_tokens=max(0, history_budget),
+            max_messages=self.max_context_messages,
+            max_message_tokens=settings.MAX_TOKENS_PER_MESSAGE
+        )
+        
+        return [*fixed_messages, *window.messages, user_message], window
+    
     async def process(
         self, 
         message: str, 
-        conversation_history: List[Dict[str, str]] = None
+        conversation_history: List[Dict[str, str]] = None,
+        budget: Optional[TokenBudget] = None,
+        summary: Optional[str] = None,
+        tool_gate: Optional[asyncio.Event] = None
     ) -> Dict[str, Any]:
         """
         Process a user message and generate response.
         
+        Runs an agent loop: the model may call tools for up to
+        AGENT_MAX_TOOL_ROUNDS rounds, each round seeing the previous results.
+        Once the rounds or the token budget are used up, a final completion
+        without tools produces the answer.
+        
         Args:
             message: User's message
             conversation_history: Previous messages for context
+            budget: Token budget to charge, a fresh one by default
+            summary: Summary of the messages older than conversation_history
+            tool_gate: When given, tools only run once it is set (used by
+                speculative execution until the router confirms this agent)
             
         Returns:
             Dict with response and metadata
         """
-        if conversation_history is None:
-            conversation_history = []
-        
-        # Build messages for AI
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ]
-        
-        # Add conversation history (last 10 messages)
-        messages.extend(conversation_history[-10:])
-        
-        # Add current user message
-        messages.append({"role": "user", "content": message})
+        messages, context = self._build_messages(message, conversation_history, summary)
+        budget = budget or TokenBudget()
         
         try:
             # Get tools for this agent
             tools = self.get_tools()
-            tool_schemas = [tool.to_openai_tool() for tool in tools]
-            
-            # Call AI with tool support
-            response = await self.ai_client.chat.completions.create(
-                model=settings.ai_model,
-                messages=messages,
-                tools=tool_schemas if tool_schemas else None,
-                temperature=settings.TEMPERATURE,
-                max_tokens=settings.MAX_TOKENS
-            )
+            tool_schemas = self.get_tool_schemas()
+            executed_calls: List[Dict[str, Any]] = []
             
-            assistant_message = response.choices[0].message
-            
-            # Check if AI wants to use tools
-            if assistant_message.tool_calls:
-                return await self._handle_tool_calls(
-                    assistant_message,
+            for round_number in range(settings.AGENT_MAX_TOOL_ROUNDS + 1):
+                use_tools = self._can_use_tools(tool_schemas, round_number, budget)
+                
+                # Call AI, with tool support while rounds and budget remain
+                response = await self.ai_client.chat.completions.create(
+                    model=settings.ai_model,
+                    messages=messages,
+                    tools=tool_schemas if use_tools else None,
+                    temperature=settings.TEMPERATURE,
+                    max_tokens=settings.MAX_TOKENS,
+                    cache=not use_tools,  # tool calls act on live data
+                    hedge=True
+                )
+                budget.add(response.usage)
+                
+                assistant_message = response.choices[0].message
+                
+                # No (allowed) tool calls, this is the final answer
+                if not (use_tools and assistant_message.tool_calls):
+                    return {
+                        "content": assistant_message.content,
+                        "agent": self.name,
+                        "tool_calls": self._summarize_tool_calls(executed_calls) or None,
+                        "usage": budget.to_dict(),
+                        "context": context.to_dict()
+                    }
+                
+                if tool_gate:
+                    await tool_gate.wait()
+                
+                tool_calls = await self._handle_tool_calls(
+                    assistant_message.content,
+                    [
+                        {
+                            "id": tc.id,
+                            "type": "function",
+                            "function": {
+                                "name": tc.function.name,
+                                "arguments": tc.function.arguments
+                            }
+                        }
+                        for tc in assistant_message.tool_calls
+                    ],
                     messages,
                     tools
                 )
+                executed_calls.extend(tool_calls)
             
-            # No tool calls, return response directly
+        except Exception as e:
             return {
-                "content": assistant_message.content,
+                "content": f"I apologize, but I encountered an error: {str(e)}",
                 "agent": self.name,
-                "tool_calls": None
+                "error": str(e),
+                "usage": budget.to_dict(),
+                "context": context.to_dict()
             }
+    
+    async def process_stream(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        budget: Optional[TokenBudget] = None,
+        summary: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of process(), running the same agent loop.
+        
+        Yields events as they happen:
+        - {"type": "token", "content": ...} for every assistant text delta
+        - {"type": "tool_call_start", "tool": ..., "arguments": ...}
+        - {"type": "tool_call_end", "tool": ..., "success": ...}
+        - {"type": "result", "response": ...} once, with the same dict process() returns
+        
+        Text the model writes before calling tools is streamed too, so the
+        result's content is all the text streamed (rounds separated by a
+        blank line), not only the last round's.
+        
+        Args:
+            message: User's message
+            conversation_history: Previous messages for context
+            budget: Token budget to charge, a fresh one by default
+            summary: Summary of the messages older than conversation_history
+        """
+        messages, context = self._build_messages(message, conversation_history, summary)
+        budget = budget or TokenBudget()
+        
+        try:
+            tools = self.get_tools()
+            tool_schemas = self.get_tool_schemas()
+            executed_calls: List[Dict[str, Any]] = []
+            # Text of earlier rounds, already sent to the client
+            streamed_parts: List[str] = []
+            
+            for round_number in range(settings.AGENT_MAX_TOOL_ROUNDS + 1):
+                use_tools = self._can_use_tools(tool_schemas, round_number, budget)
+                
+                stream = await self.ai_client.chat.completions.create(
+                    model=settings.ai_model,
+                    messages=messages,
+                    tools=tool_schemas if use_tools else None,
+                    temperature=settings.TEMPERATURE,
+                    max_tokens=settings.MAX_TOKENS,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                
+                # Tool calls arrive as fragments keyed by index, collect them
+                content_parts: List[str] = []
+                partial_calls: Dict[int, Dict[str, Any]] = {}
+                async for chunk in stream:
+                    budget.add(getattr(chunk, "usage", None))
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    
+                    if delta.content:
+                        if streamed_parts and not content_parts:
+                            streamed_parts.append("\n\n")
+                            yield {"type": "token", "content": "\n\n"}
+                        content_parts.append(delta.content)
+                        yield {"type": "token", "content": delta.content}
+                    
+                    for tc in delta.tool_calls or []:
+                        call = partial_calls.setdefault(tc.index, {
+                            "id": None,
+                            "type": "function",
+                            "function": {"name": "", "arguments": ""}
+                        })
+                        if tc.id:
+                            call["id"] = tc.id
+                        if tc.function and tc.function.name:
+                            call["function"]["name"] += tc.function.name
+                        if tc.function and tc.function.arguments:
+                            call["function"]["arguments"] += tc.function.arguments
+                
+                # No (allowed) tool calls, this is the final answer
+                if not (use_tools and partial_calls):
+                    yield {"type": "result", "response": {
+                        "content": "".join(streamed_parts + content_parts),
+                        "agent": self.name,
+                        "tool_calls": self._summarize_tool_calls(executed_calls) or None,
+                        "usage": budget.to_dict(),
+                        "context": context.to_dict()
+                    }}
+                    return
+                
+                tool_calls = [partial_calls[i] for i in sorted(partial_calls)]
+                for tool_call in tool_calls:
+                    yield {
+                        "type": "tool_call_start",
+                        "tool": tool_call["function"]["name"],
+                        "arguments": self._parse_arguments(tool_call["function"]["arguments"])
+                    }
+                
+                messages.append({
+                    "role": "assistant",
+                    "content": "".join(content_parts) or None,
+                    "tool_calls": tool_calls
+                })
+                streamed_parts.extend(content_parts)
+                
+                # Execute tools concurrently, reporting each one as it finishes
+                executor = ToolExecutor(tools)
+                
+                async def run(index: int, tool_call: Dict[str, Any]):
+                    return index, await executor.execute(tool_call)
+                
+                tool_messages: List[Optional[Dict[str, str]]] = [None] * len(tool_calls)
+                for next_done in asyncio.as_completed(
+                    [run(i, tc) for i, tc in enumerate(tool_calls)]
+                ):
+                    index, tool_message = await next_done
+                    tool_messages[index] = tool_message
+                    yield {
+                        "type": "tool_call_end",
+                        "tool": tool_calls[index]["function"]["name"],
+                        "success": self._tool_succeeded(tool_message)
+                    }
+                messages.extend(tool_messages)
+                executed_calls.extend(tool_calls)
             
         except Exception as e:
-            return {
+            yield {"type": "result", "response": {
                 "content": f"I apologize, but I encountered an error: {str(e)}",
                 "agent": self.name,
-                "error": str(e)
+                "error": str(e),
+                "usage": budget.to_dict(),
+                "context": context.to_dict()
+            }}
+    
+    @staticmethod
+    def _can_use_tools(
+        tool_schemas: List[Dict[str, Any]],
+        round_number: int,
+        budget: TokenBudget
+    ) -> bool:
+        """Whether tools are offered in this round of the agent loop"""
+        return (
+            bool(tool_schemas)
+            and round_number < settings.AGENT_MAX_TOOL_ROUNDS
+            and not budget.exhausted
+        )
+    
+    @staticmethod
+    def _parse_arguments(arguments: str) -> Dict[str, Any]:
+        """Parse tool call arguments, tolerating malformed JSON"""
+        try:
+            return json.loads(arguments) if arguments else {}
+        except json.JSONDecodeError:
+            return {}
+    
+    @classmethod
+    def _summarize_tool_calls(cls, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert OpenAI-format tool calls into the API's tool_calls field"""
+        return [
+            {
+                "tool": tc["function"]["name"],
+                "arguments": cls._parse_arguments(tc["function"]["arguments"])
             }
+            for tc in tool_calls
+        ]
+    
+    @staticmethod
+    def _tool_succeeded(tool_message: Dict[str, str]) -> bool:
+        """Check whether a tool result message reports success"""
+        if tool_message["content"].startswith("Error:"):
+            return False
+        return bool(json.loads(tool_message["content"]).get("success"))
     
     async def _handle_tool_calls(
         self,
-        assistant_message: Any,
-        messages: List[Dict[str, str]],
+        content: Optional[str],
+        tool_calls: List[Dict[str, Any]],
+        messages: List[Dict[str, Any]],
         tools: List[BaseTool]
-    ) -> Dict[str, Any]:
+    ) -> List[Dict[str, Any]]:
         """
-        Handle tool calls from AI.
+        Handle one round of tool calls from AI.
+        
+        Appends the assistant's tool call message and the tool results to
+        messages, ready for the next completion.
         
         Args:
-            assistant_message: Message with tool calls
+            content: Text the assistant sent along with the tool calls
+            tool_calls: Tool calls in OpenAI message format
             messages: Conversation history
             tools: Available tools
             
         Returns:
-            Final response after tool execution
+            The executed tool calls
         """
         # Add assistant's tool call to messages
         messages.append({
             "role": "assistant",
-            "content": assistant_message.content,
-            "tool_calls": [
-                {
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments
-                    }
-                }
-                for tc in assistant_message.tool_calls
-            ]
+            "content": content,
+            "tool_calls": tool_calls
         })
         
-        # Execute each tool call
-        tool_results = []
-        for tool_call in assistant_message.tool_calls:
-            function_name = tool_call.function.name
-            
-            # Find the tool
-            tool = next((t for t in tools if t.name == function_name), None)
-            
-            if not tool:
-                tool_results.append({
-                    "tool_call_id": tool_call.id,
-                    "role": "tool",
-                    "content": f"Error: Tool {function_name} not found"
-                })
-                continue
-            
-            # Parse arguments
-            import json
-            try:
-                arguments = json.loads(tool_call.function.arguments)
-            except json.JSONDecodeError:
-                tool_results.append({
-                    "tool_call_id": tool_call.id,
-                    "role": "tool",
-                    "content": "Error: Invalid tool arguments"
-                })
-                continue
-            
-            # Execute tool
-            result = await tool.execute(**arguments)
-            
-            # Add result to messages
-            tool_results.append({
-                "tool_call_id": tool_call.id,
-                "role": "tool",
-                "content": json.dumps(result.dict())
-            })
-        
-        # Add tool results to messages
-        messages.extend(tool_results)
+        # Execute tool calls concurrently, results keep tool_call_id order
+        messages.extend(await ToolExecutor(tools).execute_all(tool_calls))
         
-        # Get final response from AI with tool results
-        final_response = await self.ai_client.chat.completions.create(
-            model=settings.ai_model,
-            messages=messages,
-            temperature=settings.TEMPERATURE,
-            max_tokens=settings.MAX_TOKENS
-        )
-        
-        return {
-            "content": final_response.choices[0].message.content,
-            "agent": self.name,
-            "tool_calls": [
-                {
-                    "tool": tc.function.name,
-                    "arguments": json.loads(tc.function.arguments)
-                }
-                for tc in assistant_message.tool_calls
-            ]
-        }
\ No newline at end of file
+        return tool_calls
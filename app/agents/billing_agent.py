@@ -1,5 +1,4 @@
 from typing import List
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agents.base_agent import BaseAgent
 from app.tools.base_tool import BaseTool
@@ -16,8 +15,8 @@ class BillingAgent(BaseAgent):
     Has access to payment database and can process refunds.
     """
     
-    def __init__(self, db: AsyncSession):
-        super().__init__(db)
+    def __init__(self):
+        super().__init__()
         self._tools = None
     
     @property
@@ -70,8 +69,8 @@ Refund Policy:
         """Initialize and return billing tools"""
         if self._tools is None:
             self._tools = [
-                GetInvoiceDetailsTool(self.db),
-                CheckRefundStatusTool(self.db),
-                ProcessRefundTool(self.db)
+                GetInvoiceDetailsTool(),
+                CheckRefundStatusTool(),
+                ProcessRefundTool()
             ]
         return self._tools
\ No newline at end of file
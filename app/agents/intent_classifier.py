@@ -0,0 +1,166 @@
+import os
+import time
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.text_features import hash_embed
+
+
+class IntentClassifier:
+    """
+    Local first-stage router: nearest-centroid over hashed text features.
+    
+    Each agent is represented by the normalized mean of the hash_embed()
+    vectors of the user messages it handled. Prediction is a dot product
+    against the centroids; a softmax over the cosine scores gives the
+    confidence the router compares with ROUTER_CLASSIFIER_THRESHOLD.
+    """
+    
+    # Softmax sharpness for cosine scores in [-1, 1]
+    SCALE = 10.0
+    
+    def __init__(self, centroids: np.ndarray, labels: List[str], dim: int):
+        self.centroids = centroids
+        self.labels = labels
+        self.dim = dim
+    
+    @classmethod
+    def train(
+        cls,
+        texts: List[str],
+        labels: List[str],
+        dim: int = 1024,
+        required_labels: Iterable[str] = (),
+        min_per_label: int = 1
+    ) -> "IntentClassifier":
+        """
+        Fit centroids from labelled messages.
+        
+        Args:
+            texts: User messages
+            labels: Agent that handled each message
+            dim: Feature vector size
+            required_labels: Agents the classifier must be able to predict
+            min_per_label: Examples needed for each of them
+        
+        Returns:
+            Trained classifier
+        
+        Raises:
+            ValueError: If there are fewer than two labels, or a required
+                label has fewer than min_per_label examples. A classifier
+                that knows one agent routes everything there with full
+                confidence.
+        """
+        counts = Counter(labels)
+        short = {
+            label: counts[label] for label in sorted(required_labels)
+            if counts[label] < min_per_label
+        }
+        if short:
+            raise ValueError(f"Need {min_per_label} examples per agent, have {short}")
+        if len(counts) < 2:
+            raise ValueError(f"Need examples of at least two agents, have {dict(counts)}")
+        
+        label_names = sorted(counts)
+        vectors = np.stack([hash_embed(text, dim) for text in texts])
+        label_array = np.array(labels)
+        
+        centroids = np.zeros((len(label_names), dim), dtype=np.float32)
+        for i, label in enumerate(label_names):
+            centroid = vectors[label_array == label].mean(axis=0)
+            norm = np.linalg.norm(centroid)
+            centroids[i] = centroid / norm if norm > 0 else centroid
+        
+        return cls(centroids, label_names, dim)
+    
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Classify a message.
+        
+        Returns:
+            Tuple of (agent name, confidence)
+        """
+        scores = self.centroids @ hash_embed(text, self.dim)
+        exp = np.exp(self.SCALE * (scores - scores.max()))
+        probabilities = exp / exp.sum()
+        best = int(np.argmax(probabilities))
+        return self.labels[best], round(float(probabilities[best]), 4)
+    
+    def evaluate(
+        self,
+        texts: List[str],
+        labels: List[str],
+        threshold: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Accuracy and latency on held-out messages.
+        
+        Args:
+            texts: User messages
+            labels: Expected agents
+            threshold: Confidence threshold to report coverage for
+        
+        Returns:
+            Report dict
+        """
+        threshold = settings.ROUTER_CLASSIFIER_THRESHOLD if threshold is None else threshold
+        latencies = []
+        correct = 0
+        confident = 0
+        confident_correct = 0
+        
+        for text, label in zip(texts, labels):
+            start = time.perf_counter()
+            predicted, confidence = self.predict(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+            
+            correct += predicted == label
+            if confidence >= threshold:
+                confident += 1
+                confident_correct += predicted == label
+        
+        total = len(texts)
+        return {
+            "examples": total,
+            "accuracy": round(correct / total, 4) if total else 0.0,
+            "threshold": threshold,
+            # Share of messages the LLM router no longer sees, and accuracy on them
+            "coverage": round(confident / total, 4) if total else 0.0,
+            "confident_accuracy": round(confident_correct / confident, 4) if confident else 0.0,
+            "latency_ms_avg": round(float(np.mean(latencies)), 4) if latencies else 0.0,
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 4) if latencies else 0.0
+        }
+    
+    def save(self, path: str) -> None:
+        """Persist the model as a .npz file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, centroids=self.centroids, labels=np.array(self.labels), dim=self.dim)
+    
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        """Load a model saved with save()"""
+        with np.load(path) as data:
+            return cls(data["centroids"], [str(label) for label in data["labels"]], int(data["dim"]))
+
+
+# Loaded once at startup, None when no model has been trained yet
+_classifier: Optional[IntentClassifier] = None
+
+
+def load_intent_classifier(path: Optional[str] = None) -> Optional[IntentClassifier]:
+    """Load the persisted classifier if it exists"""
+    global _classifier
+    path = path or settings.ROUTER_CLASSIFIER_PATH
+    _classifier = IntentClassifier.load(path) if os.path.exists(path) else None
+    return _classifier
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """The classifier loaded at startup, if any"""
+    if not settings.ROUTER_CLASSIFIER_ENABLED:
+        return None
+    return _classifier
@@ -1,5 +1,4 @@
 from typing import List
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agents.base_agent import BaseAgent
 from app.tools.base_tool import BaseTool
@@ -17,8 +16,8 @@ class OrderAgent(BaseAgent):
     Has access to order database and can modify/cancel orders.
     """
     
-    def __init__(self, db: AsyncSession):
-        super().__init__(db)
+    def __init__(self):
+        super().__init__()
         self._tools = None
     
     @property
@@ -66,9 +65,9 @@ Order Status Meanings:
         """Initialize and return order tools"""
         if self._tools is None:
             self._tools = [
-                FetchOrderDetailsTool(self.db),
-                CheckDeliveryStatusTool(self.db),
-                ModifyOrderTool(self.db),
-                CancelOrderTool(self.db)
+                FetchOrderDetailsTool(),
+                CheckDeliveryStatusTool(),
+                ModifyOrderTool(),
+                CancelOrderTool()
             ]
         return self._tools
\ No newline at end of file
@@ -1,7 +1,8 @@
+import math
 from typing import List, Dict, Any
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agents.base_agent import BaseAgent
+from app.agents.intent_classifier import get_intent_classifier
 from app.tools.base_tool import BaseTool
 from app.core.ai_client import ai_client
 from app.core.config import settings
@@ -13,8 +14,8 @@ class RouterAgent(BaseAgent):
     This is the 'brain' that decides which agent should handle each query.
     """
     
-    def __init__(self, db: AsyncSession):
-        super().__init__(db)
+    def __init__(self):
+        super().__init__()
     
     @property
     def name(self) -> str:
@@ -61,6 +62,14 @@ Respond with ONLY a JSON object in this exact format:
 
 Do not include any other text or markdown formatting."""
     
+    @property
+    def max_context_messages(self) -> int:
+        return settings.ROUTER_MAX_CONTEXT_MESSAGES
+    
+    @property
+    def max_context_tokens(self) -> int:
+        return settings.ROUTER_MAX_TOKENS_PER_CONTEXT
+    
     def get_tools(self) -> List[BaseTool]:
         """Router doesn't use tools, it just classifies"""
         return []
@@ -73,6 +82,9 @@ Do not include any other text or markdown formatting."""
         """
         Analyze message and determine which agent should handle it.
         
+        The local intent classifier answers when it is confident enough,
+        the LLM is only asked otherwise.
+        
         Args:
             message: User's message
             conversation_history: Previous messages for context
@@ -80,23 +92,26 @@ Do not include any other text or markdown formatting."""
         Returns:
             Dict with routing decision
         """
-        if conversation_history is None:
-            conversation_history = []
+        classifier = get_intent_classifier()
+        if classifier:
+            agent, confidence = classifier.predict(message)
+            if confidence >= settings.ROUTER_CLASSIFIER_THRESHOLD:
+                return {
+                    "agent": agent,
+                    "confidence": confidence,
+                    "reasoning": "Local intent classifier"
+                }
         
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ]
-        
-        # Add recent context (last 5 messages)
-        messages.extend(conversation_history[-5:])
-        messages.append({"role": "user", "content": message})
+        # Add recent context within the router's token budget
+        messages, _ = self._build_messages(message, conversation_history)
         
         try:
             response = await self.ai_client.chat.completions.create(
                 model=settings.ai_model,
                 messages=messages,
                 temperature=0.3,  # Lower temp for consistent routing
-                max_tokens=200
+                max_tokens=200,
+                hedge=True  # on the critical path of every routed message
             )
             
             content = response.choices[0].message.content.strip()
@@ -113,7 +128,7 @@ Do not include any other text or markdown formatting."""
             
             return {
                 "agent": result.get("agent", "support"),
-                "confidence": result.get("confidence", 0.5),
+                "confidence": self._confidence(result.get("confidence")),
                 "reasoning": result.get("reasoning", "")
             }
             
@@ -123,4 +138,15 @@ Do not include any other text or markdown formatting."""
                 "agent": "support",
                 "confidence": 0.5,
                 "reasoning": f"Routing error, defaulting to support: {str(e)}"
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def _confidence(value: Any) -> float:
+        """The LLM's confidence as a float in [0, 1], 0.5 if it isn't a number"""
+        try:
+            confidence = float(value)
+        except (TypeError, ValueError):
+            return 0.5
+        if math.isnan(confidence):
+            return 0.5
+        return min(max(confidence, 0.0), 1.0)
@@ -1,9 +1,11 @@
-from typing import List
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+from typing import List, Dict, Any, Optional, AsyncIterator
 
-from app.agents.base_agent import BaseAgent
+from app.agents.base_agent import BaseAgent, TokenBudget
 from app.tools.base_tool import BaseTool
 from app.tools import support_tools
+from app.core.config import settings
+from app.core.semantic_cache import semantic_cache, SemanticCacheEntry
 
 class SupportAgent(BaseAgent):
     """
@@ -11,8 +13,8 @@ class SupportAgent(BaseAgent):
     Has access to conversation history and FAQ database.
     """
     
-    def __init__(self, db: AsyncSession):
-        super().__init__(db)
+    def __init__(self):
+        super().__init__()
         self._tools = None
     
     @property
@@ -49,7 +51,82 @@ Guidelines:
         """Initialize and return support tools"""
         if self._tools is None:
             self._tools = [
-    support_tools.SearchFAQTool(self.db),
-    support_tools.QueryConversationHistoryTool(self.db)
+    support_tools.SearchFAQTool(),
+    support_tools.QueryConversationHistoryTool()
 ]
-        return self._tools
\ No newline at end of file
+        return self._tools
+    
+    async def process(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        budget: Optional[TokenBudget] = None,
+        summary: Optional[str] = None,
+        tool_gate: Optional[asyncio.Event] = None
+    ) -> Dict[str, Any]:
+        """
+        Answer from the semantic cache on a first turn, otherwise run the
+        normal agent loop and remember tool-free first-turn answers.
+        """
+        cacheable = self._is_cacheable_turn(conversation_history, summary)
+        
+        if cacheable:
+            entry = semantic_cache.lookup(message)
+            if entry:
+                return self._cached_response(entry)
+        
+        response = await super().process(
+            message, conversation_history, budget, summary, tool_gate=tool_gate
+        )
+        
+        if cacheable:
+            self._remember(message, response)
+        return response
+    
+    async def process_stream(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        budget: Optional[TokenBudget] = None,
+        summary: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of process() with the same semantic cache"""
+        cacheable = self._is_cacheable_turn(conversation_history, summary)
+        
+        if cacheable:
+            entry = semantic_cache.lookup(message)
+            if entry:
+                yield {"type": "token", "content": entry.answer}
+                yield {"type": "result", "response": self._cached_response(entry)}
+                return
+        
+        async for event in super().process_stream(message, conversation_history, budget, summary):
+            if event["type"] == "result" and cacheable:
+                self._remember(message, event["response"])
+            yield event
+    
+    @staticmethod
+    def _is_cacheable_turn(
+        conversation_history: Optional[List[Dict[str, str]]],
+        summary: Optional[str]
+    ) -> bool:
+        """Only first turns are answered from the cache, they have no context"""
+        return settings.SEMANTIC_CACHE_ENABLED and not conversation_history and not summary
+    
+    def _cached_response(self, entry: SemanticCacheEntry) -> Dict[str, Any]:
+        return {
+            "content": entry.answer,
+            "agent": self.name,
+            "tool_calls": None,
+            "semantic_cache": {
+                "entry_id": entry.id,
+                "similarity": entry.similarity
+            }
+        }
+    
+    @staticmethod
+    def _remember(message: str, response: Dict[str, Any]) -> None:
+        """Store answers that needed no tools and didn't fail"""
+        if response.get("tool_calls") or response.get("error") or not response.get("content"):
+            return
+        semantic_cache.add(message, response["content"])
\ No newline at end of file
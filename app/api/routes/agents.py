@@ -1,21 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Response
 from typing import Dict, Any, List
 
-from app.core.database import get_db
-from app.services.agent_service import AgentService
+from app.core.semantic_cache import semantic_cache
+from app.services.agent_registry import get_agent_registry
 
 router = APIRouter(prefix="/api/agents", tags=["Agents"])
 
+# Agent metadata only changes with a deploy
+AGENT_INFO_CACHE_CONTROL = "public, max-age=300"
+
 
 @router.get("/")
-async def list_agents(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
+async def list_agents(response: Response) -> Dict[str, Any]:
     """
     List all available agents and their capabilities.
     """
     try:
-        agent_service = AgentService(db)
-        return agent_service.get_agent_info()
+        response.headers["Cache-Control"] = AGENT_INFO_CACHE_CONTROL
+        return get_agent_registry().get_agent_info()
         
     except Exception as e:
         raise HTTPException(
@@ -27,7 +29,7 @@ async def list_agents(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
 @router.get("/{agent_type}/capabilities")
 async def get_agent_capabilities(
     agent_type: str,
-    db: AsyncSession = Depends(get_db)
+    response: Response
 ) -> Dict[str, Any]:
     """
     Get capabilities of a specific agent.
@@ -36,12 +38,12 @@ async def get_agent_capabilities(
         agent_type: "support", "order", or "billing"
     """
     try:
-        agent_service = AgentService(db)
-        info = agent_service.get_agent_info(agent_type)
+        info = get_agent_registry().get_agent_info(agent_type)
         
         if "error" in info:
             raise HTTPException(status_code=404, detail=info["error"])
         
+        response.headers["Cache-Control"] = AGENT_INFO_CACHE_CONTROL
         return info
         
     except HTTPException:
@@ -50,4 +52,32 @@ async def get_agent_capabilities(
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch agent capabilities: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/support/semantic-cache")
+async def get_semantic_cache_stats() -> Dict[str, Any]:
+    """
+    Statistics and entries of the support agent's semantic answer cache.
+    """
+    return {
+        **semantic_cache.stats(),
+        "items": [
+            {"id": entry.id, "question": entry.question, "hits": entry.hits}
+            for entry in semantic_cache.entries()
+        ]
+    }
+
+
+@router.delete("/support/semantic-cache/{entry_id}")
+async def invalidate_semantic_cache_entry(entry_id: str) -> Dict[str, Any]:
+    """
+    Remove a cached answer, e.g. after the policy it describes changed.
+    
+    Args:
+        entry_id: Entry id as listed by GET /support/semantic-cache
+    """
+    if not semantic_cache.invalidate(entry_id):
+        raise HTTPException(status_code=404, detail="Cache entry not found")
+    
+    return {"message": "Cache entry invalidated"}
\ No newline at end of file
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Dict, Any, Optional, AsyncIterator
+import json
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, read_session, recently_written, AsyncSessionLocal
 from app.services.chat_service import ChatService
-from app.services.conversation_service import ConversationService
+from app.services.conversation_service import ConversationService, ConversationNotFoundError
+from app.services.identity_service import IdentityResolver, UserNotFoundError
 from app.schemas.chat import (
     MessageCreate,
     ChatResponse,
@@ -41,6 +44,8 @@ async def send_message(
         
         return response
         
+    except (UserNotFoundError, ConversationNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -48,10 +53,66 @@ async def send_message(
         )
 
 
+def _format_sse(event: Dict[str, Any]) -> str:
+    """Format an event dict as a Server-Sent Events frame"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.post("/messages/stream")
+async def stream_message(message_data: MessageCreate):
+    """
+    Send a message and stream the AI response as Server-Sent Events.
+    
+    Events, in order:
+    1. conversation - conversation id (new or existing)
+    2. routing - which agent was selected
+    3. tool_call_start / tool_call_end - tool execution progress
+    4. token - assistant text as it is generated
+    5. done - final payload, same shape as POST /messages
+    """
+    async def event_stream():
+        # The request-scoped get_db session is closed before a streaming
+        # body is sent, so the stream owns its session
+        async with AsyncSessionLocal() as db:
+            try:
+                chat_service = ChatService(db)
+                
+                async for event in chat_service.send_message_stream(
+                    message=message_data.message,
+                    conversation_id=message_data.conversation_id,
+                    user_id=message_data.user_id
+                ):
+                    yield _format_sse(event)
+                
+                await db.commit()
+                
+            except Exception as e:
+                await db.rollback()
+                yield _format_sse({
+                    "type": "error",
+                    "error": f"Failed to process message: {str(e)}"
+                })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering
+        }
+    )
+
+
+async def get_conversation_read_db(conversation_id: str) -> AsyncIterator[AsyncSession]:
+    """Read session for one conversation, the primary right after a write to it"""
+    async with read_session(conversation_id) as session:
+        yield session
+
+
 @router.get("/conversations/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation(
     conversation_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_conversation_read_db)
 ):
     """
     Get conversation details with all messages.
@@ -98,25 +159,46 @@ async def get_conversation(
 
 @router.get("/conversations", response_model=List[ConversationResponse])
 async def list_conversations(
+    response: Response,
     limit: int = 20,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all conversations for current user.
+    
+    Pass the X-Next-Cursor header of a page as cursor to get the next one;
+    the header is missing on the last page.
     """
     try:
         conv_service = ConversationService(db)
         
         # Get default user (in production, get from auth)
-        user = await conv_service.get_or_create_default_user()
-        
-        # Get conversations
-        conversations = await conv_service.get_user_conversations(
-            user_id=str(user.id),
-            limit=limit,
-            offset=offset
-        )
+        user_id = await IdentityResolver(db).default_user_id(create=False)
+        if not user_id:
+            return []
+        
+        # Get conversations, from the primary if the replica may not have the latest turn
+        if recently_written(user_id):
+            async with AsyncSessionLocal() as primary:
+                conversations = await ConversationService(primary).get_user_conversations(
+                    user_id=user_id,
+                    limit=limit,
+                    offset=offset,
+                    cursor=cursor
+                )
+        else:
+            conversations = await conv_service.get_user_conversations(
+                user_id=user_id,
+                limit=limit,
+                offset=offset,
+                cursor=cursor
+            )
+        
+        next_cursor = conv_service.next_cursor(conversations, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         return [
             {
@@ -126,11 +208,13 @@ async def list_conversations(
                 "status": conv.status.value,
                 "created_at": conv.created_at,
                 "updated_at": conv.updated_at,
-                "message_count": 0  # Can add count query if needed
+                "message_count": conv.message_count
             }
             for conv in conversations
         ]
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
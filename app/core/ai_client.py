@@ -1,20 +1,79 @@
+from typing import List, Optional
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.core.http_transport import ai_timeout, http_client
+from app.core.llm_cache import CachedAIClient, CompletionCache
+from app.core.provider_pool import Provider, ProviderPool
 
 
-def get_ai_client() -> AsyncOpenAI:
+def get_ai_client(
+    api_key: str,
+    base_url: Optional[str],
+    max_retries: Optional[int] = None
+) -> AsyncOpenAI:
     """
-    Get AI client based on configured provider.
-    Works with both OpenAI and Groq using OpenAI SDK.
+    Get an AI client for one provider.
+    Works with OpenAI, Groq and local servers using OpenAI SDK.
+    
+    Args:
+        api_key: Provider API key
+        base_url: None for OpenAI, the provider's URL otherwise
+        max_retries: SDK retries on the same provider, AI_MAX_RETRIES by default
     
     Returns:
         AsyncOpenAI: Configured async client
     """
     return AsyncOpenAI(
-        api_key=settings.ai_api_key,
-        base_url=settings.ai_base_url  # None for OpenAI, Groq URL for Groq
+        api_key=api_key,
+        base_url=base_url or None,
+        timeout=ai_timeout(),
+        max_retries=settings.AI_MAX_RETRIES if max_retries is None else max_retries,
+        http_client=http_client  # shared connection pool
     )
 
 
-# Global client instance (reuse across app)
-ai_client = get_ai_client()
+def get_providers() -> List[Provider]:
+    """
+    Providers to spread completions over, AI_PROVIDER first.
+    
+    AI_PROVIDER is always included (even without an API key, as before);
+    with failover enabled so is every other provider that has credentials
+    (an API key, for the local server a base URL).
+    """
+    configured = {
+        "groq": (settings.GROQ_API_KEY, settings.GROQ_BASE_URL, settings.GROQ_MODEL),
+        "openai": (settings.OPENAI_API_KEY, None, settings.OPENAI_MODEL),
+        "local": (
+            settings.LOCAL_AI_API_KEY if settings.LOCAL_AI_BASE_URL else "",
+            settings.LOCAL_AI_BASE_URL,
+            settings.LOCAL_AI_MODEL
+        )
+    }
+    primary = settings.AI_PROVIDER if settings.AI_PROVIDER in configured else "openai"
+    names = [primary]
+    if settings.AI_FAILOVER_ENABLED:
+        names += [name for name, (api_key, _, _) in configured.items() if api_key and name != primary]
+    
+    # The pool fails over instead of retrying the same provider
+    max_retries = settings.AI_MAX_RETRIES if len(names) == 1 else 0
+    return [
+        Provider(
+            name,
+            get_ai_client(configured[name][0], configured[name][1], max_retries),
+            configured[name][2]
+        )
+        for name in names
+    ]
+
+
+provider_pool = ProviderPool(get_providers(), failover=settings.AI_FAILOVER_ENABLED)
+
+# Global client instance (reuse across app): an exact-match completion
+# cache in front of the provider pool
+ai_client = CachedAIClient(
+    provider_pool,
+    CompletionCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+    )
+)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import List
 
 
 class Settings(BaseSettings):
@@ -17,7 +17,18 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
-    DATABASE_ECHO: bool = True
+    DATABASE_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Read replica (empty: all reads go to DATABASE_URL)
+    DATABASE_READ_URL: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    IDENTITY_CACHE_TTL_SECONDS: float = 300.0
+    IDENTITY_CACHE_MAX_ENTRIES: int = 10000
 
     def model_post_init(self, __context):
         if self.DATABASE_URL.startswith("postgresql://"):
@@ -26,6 +37,12 @@ class Settings(BaseSettings):
                 "postgresql+asyncpg://",
                 1
             )
+        if self.SUMMARY_KEEP_RECENT > self.MAX_CONTEXT_MESSAGES:
+            # Messages between the two would be neither summarized nor sent
+            raise ValueError(
+                f"SUMMARY_KEEP_RECENT ({self.SUMMARY_KEEP_RECENT}) must not exceed "
+                f"MAX_CONTEXT_MESSAGES ({self.MAX_CONTEXT_MESSAGES})"
+            )
 
     # AI Configuration
     AI_PROVIDER: str = "groq"
@@ -39,10 +56,88 @@ class Settings(BaseSettings):
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
     GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"
 
+    # Local OpenAI-compatible server, e.g. fake_ai_server.py (empty: disabled)
+    LOCAL_AI_BASE_URL: str = ""
+    LOCAL_AI_MODEL: str = "fake-model"
+    LOCAL_AI_API_KEY: str = "local"
+
+    # Provider Pool (latency-aware selection and failover between every
+    # provider with credentials; AI_PROVIDER is tried first)
+    AI_FAILOVER_ENABLED: bool = True
+    AI_REQUEST_TIMEOUT_SECONDS: float = 30.0
+    # SDK retries (429/5xx, jittered backoff) on the same provider, used
+    # when there is no other provider to fail over to
+    AI_MAX_RETRIES: int = 2
+    AI_PROVIDER_EWMA_ALPHA: float = 0.2
+    AI_PROVIDER_FAILURE_THRESHOLD: int = 3
+    AI_PROVIDER_COOLDOWN_SECONDS: float = 30.0
+    AI_PROVIDER_STATS_WINDOW_SECONDS: float = 300.0
+
+    # AI HTTP Transport (one connection pool shared by every provider)
+    AI_HTTP_MAX_CONNECTIONS: int = 100
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    AI_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 120.0
+    AI_HTTP2_ENABLED: bool = False  # needs the h2 package (httpx[http2])
+    AI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AI_WRITE_TIMEOUT_SECONDS: float = 10.0
+    AI_POOL_TIMEOUT_SECONDS: float = 5.0
+    AI_CONNECT_RETRIES: int = 2
+    AI_CONNECT_RETRY_BACKOFF_SECONDS: float = 0.2
+
+    # Hedged Requests (duplicate a slow completion, first answer wins)
+    AI_HEDGING_ENABLED: bool = False
+    AI_HEDGE_PERCENTILE: float = 95.0
+    AI_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    AI_HEDGE_MIN_SAMPLES: int = 20
+    AI_HEDGE_SAMPLE_WINDOW: int = 200
+    AI_HEDGE_MAX_RATE: float = 0.05
+
     # AI Settings
     MAX_TOKENS: int = 1000
     TEMPERATURE: float = 0.7
 
+    # LLM Completion Cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_TTL_SECONDS: float = 300.0
+
+    # Deterministic Fast Path (order/invoice lookups without the LLM)
+    FAST_PATH_ENABLED: bool = True
+    FAST_PATH_MAX_WORDS: int = 25
+
+    # Local Router Classifier (LLM router only below the threshold)
+    ROUTER_CLASSIFIER_ENABLED: bool = True
+    ROUTER_CLASSIFIER_PATH: str = "data/router_classifier.npz"
+    ROUTER_CLASSIFIER_THRESHOLD: float = 0.8
+
+    # Sticky Routing (follow-ups reuse the conversation's last agent)
+    STICKY_ROUTING_ENABLED: bool = True
+    STICKY_ROUTING_MIN_CONFIDENCE: float = 0.8
+    STICKY_ROUTING_MAX_TURNS: int = 5
+
+    # Speculative Routing (start the likely specialist alongside the router)
+    SPECULATIVE_ROUTING_ENABLED: bool = False
+
+    # Semantic Answer Cache (support agent, first turns)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    # Cosine over key terms; a match also needs equal key terms and negation.
+    # Paraphrases with equal terms score >= 0.88 (word order only), see
+    # tests/test_semantic_cache.py
+    SEMANTIC_CACHE_THRESHOLD: float = 0.85
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 2000
+    SEMANTIC_CACHE_DIM: int = 1024
+
+    # Agent Loop
+    AGENT_MAX_TOOL_ROUNDS: int = 3
+    AGENT_TOKEN_BUDGET: int = 8000
+
+    # Tool Execution
+    TOOL_MAX_CONCURRENCY: int = 4
+    TOOL_TIMEOUT_SECONDS: float = 10.0
+    TOOL_CACHE_ENABLED: bool = True
+    TOOL_CACHE_TTL_SECONDS: float = 30.0
+    TOOL_CACHE_MAX_ENTRIES: int = 5000
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 20
 
@@ -58,25 +153,36 @@ class Settings(BaseSettings):
     # Context Management
     MAX_CONTEXT_MESSAGES: int = 10
     MAX_TOKENS_PER_CONTEXT: int = 3000
-
-    @property
-    def ai_api_key(self) -> str:
-        if self.AI_PROVIDER == "groq":
-            return self.GROQ_API_KEY
-        return self.OPENAI_API_KEY
+    MAX_TOKENS_PER_MESSAGE: int = 800
+    ROUTER_MAX_CONTEXT_MESSAGES: int = 5
+    ROUTER_MAX_TOKENS_PER_CONTEXT: int = 1200
+
+    # History Cache (recent messages of active conversations, per worker)
+    HISTORY_CACHE_ENABLED: bool = True
+    HISTORY_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    HISTORY_CACHE_MAX_MESSAGES: int = 50
+    HISTORY_CACHE_TTL_SECONDS: float = 600.0
+
+    # Purge of soft-deleted conversations
+    PURGE_INTERVAL_SECONDS: float = 60.0
+    PURGE_CONVERSATION_BATCH_SIZE: int = 50
+    PURGE_MESSAGE_BATCH_SIZE: int = 5000
+
+    # Conversation Summaries
+    SUMMARY_ENABLED: bool = True
+    # Summarized once more than MAX_CONTEXT_MESSAGES are past the summary,
+    # keeping this many newest; lower than the window so it isn't every turn
+    SUMMARY_KEEP_RECENT: int = 6
+    SUMMARY_MAX_TOKENS: int = 300
 
     @property
     def ai_model(self) -> str:
         if self.AI_PROVIDER == "groq":
             return self.GROQ_MODEL
+        if self.AI_PROVIDER == "local":
+            return self.LOCAL_AI_MODEL
         return self.OPENAI_MODEL
 
-    @property
-    def ai_base_url(self) -> Optional[str]:
-        if self.AI_PROVIDER == "groq":
-            return self.GROQ_BASE_URL
-        return None
-
     class Config:
         env_file = ".env"
         case_sensitive = True
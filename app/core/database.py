@@ -1,16 +1,77 @@
+import time
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
-from typing import AsyncGenerator
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Dict, Any, Optional
 from app.core.config import settings
 
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long checkouts take.
+    
+    Checkout time includes waiting for a free connection when the pool
+    and its overflow are exhausted, and opening a new connection.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current occupancy and checkout timings"""
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3)
+        }
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url.replace("postgresql://","postgresql+asyncpg://"),
+        echo = settings.DATABASE_ECHO,
+        future = True,
+        pool_pre_ping = True,
+        poolclass = InstrumentedQueuePool,
+        pool_size = settings.DB_POOL_SIZE,
+        max_overflow = settings.DB_MAX_OVERFLOW,
+        pool_timeout = settings.DB_POOL_TIMEOUT,
+        pool_recycle = settings.DB_POOL_RECYCLE,
+        connect_args = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        },
+    )
+
+
 #async database engine
-engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://","postgresql+asyncpg://"),
-    echo = settings.DEBUG,
-    future = True,
-    pool_pre_ping = True,
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+#read replica engine, the primary when no replica is configured
+read_engine = _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 
 #sessino facrtor (har request ke liye naya session)
 AsyncSessionLocal = async_sessionmaker(
@@ -21,6 +82,45 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush = False
 )
 
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit = False,
+    autocommit = False,
+    autoflush = False
+)
+
+# Read-your-writes guard: key -> monotonic time until which reads go to the primary
+_recent_writes: Dict[str, float] = {}
+
+
+def mark_written(key: str) -> None:
+    """
+    Note a write to key (a conversation id, user id, order number...).
+    
+    Reads of key are sent to the primary for READ_YOUR_WRITES_SECONDS,
+    long enough for the replica to catch up.
+    """
+    if read_engine is engine:
+        return
+    now = time.monotonic()
+    if len(_recent_writes) > 10000:
+        for stale in [k for k, until in _recent_writes.items() if until < now]:
+            del _recent_writes[stale]
+    _recent_writes[key] = now + settings.READ_YOUR_WRITES_SECONDS
+
+
+def recently_written(key: Optional[str]) -> bool:
+    """True if key was written recently enough that the replica may lag"""
+    return key is not None and _recent_writes.get(key, 0.0) > time.monotonic()
+
+
+def read_session(key: Optional[str] = None) -> AsyncSession:
+    """New read-only session: the replica, or the primary right after a write to key"""
+    if recently_written(key):
+        return AsyncSessionLocal()
+    return AsyncReadSessionLocal()
+
 #base class for all models
 Base = declarative_base()
 
@@ -47,6 +147,15 @@ async def get_db() ->AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only session dependency, served by the read replica if configured.
+    Nothing is committed.
+    """
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+
 async def init_db():
     """Database initialization ie table creation"""
 
@@ -60,4 +169,14 @@ async def init_db():
 async def close_db():
     """Database closing"""
     await engine.dispose()
-    print("Database connection closed")
\ No newline at end of file
+    if read_engine is not engine:
+        await read_engine.dispose()
+    print("Database connection closed")
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Connection pool statistics for the health endpoint"""
+    return {
+        "primary": engine.pool.stats(),
+        "replica": read_engine.pool.stats() if read_engine is not engine else None
+    }
@@ -0,0 +1,161 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.common import MessageRole
+
+
+# (role, content, created_at)
+HistoryRow = Tuple[MessageRole, str, datetime]
+
+# Rough per-message overhead of the tuple and its objects, in bytes
+ROW_OVERHEAD_BYTES = 200
+
+
+class _History:
+    """Cached tail of one conversation"""
+    
+    def __init__(self, rows: List[HistoryRow], floor: Optional[datetime], complete: bool):
+        self.rows = rows
+        # complete: rows hold every message created after floor
+        self.floor = floor
+        self.complete = complete
+        self.size = sum(_row_size(row) for row in rows)
+        self.expires_at = time.monotonic() + settings.HISTORY_CACHE_TTL_SECONDS
+
+
+def _row_size(row: HistoryRow) -> int:
+    return len(row[1].encode("utf-8")) + ROW_OVERHEAD_BYTES
+
+
+class HistoryCache:
+    """
+    In-process cache of the newest messages of active conversations.
+    
+    Filled from the windowed history query on a miss and kept current by
+    appending every message this worker writes. Bounded by the total size
+    of the cached messages (least recently used conversation goes first)
+    and by a TTL, which also limits staleness when other workers write to
+    the same conversation.
+    """
+    
+    def __init__(self, max_bytes: int, max_messages: int):
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self._entries: "OrderedDict[str, _History]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(
+        self,
+        conversation_id: str,
+        limit: int,
+        after: Optional[datetime] = None
+    ) -> Optional[List[Tuple[MessageRole, str]]]:
+        """
+        The last limit messages created after after, if the cache can tell.
+        
+        Returns:
+            (role, content) rows in chronological order, or None on a miss
+        """
+        entry = self._entries.get(conversation_id)
+        if entry is not None and entry.expires_at < time.monotonic():
+            self._remove(conversation_id)
+            entry = None
+        
+        rows = None
+        if entry is not None:
+            candidates = [row for row in entry.rows if after is None or row[2] > after]
+            covers_after = entry.complete and (
+                entry.floor is None or (after is not None and after >= entry.floor)
+            )
+            if len(candidates) >= limit or covers_after:
+                rows = [(role, content) for role, content, _ in candidates[-limit:]]
+        
+        if rows is None:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(conversation_id)
+        self.hits += 1
+        return rows
+    
+    def put(
+        self,
+        conversation_id: str,
+        rows: List[HistoryRow],
+        floor: Optional[datetime],
+        complete: bool
+    ) -> None:
+        """
+        Store the tail of a conversation read from the database.
+        
+        Args:
+            conversation_id: Conversation id
+            rows: Newest messages created after floor, oldest first
+            floor: The created_at lower bound the rows were read with
+            complete: True if rows are all messages after floor
+        """
+        self._remove(conversation_id)
+        self._store(conversation_id, _History(list(rows), floor, complete))
+    
+    def append(self, conversation_id: str, rows: List[HistoryRow]) -> None:
+        """Append newly written messages to a cached conversation"""
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            return
+        
+        self._remove(conversation_id)
+        entry.rows.extend(rows)
+        entry.size += sum(_row_size(row) for row in rows)
+        if len(entry.rows) > self.max_messages:
+            dropped = entry.rows[:-self.max_messages]
+            entry.rows = entry.rows[-self.max_messages:]
+            entry.size -= sum(_row_size(row) for row in dropped)
+            entry.complete = False
+        self._store(conversation_id, entry)
+    
+    def invalidate(self, conversation_id: str) -> None:
+        self._remove(conversation_id)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "conversations": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+    
+    def _store(self, conversation_id: str, entry: _History) -> None:
+        if entry.size > self.max_bytes:
+            return
+        self._entries[conversation_id] = entry
+        self.total_bytes += entry.size
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+    
+    def _remove(self, conversation_id: str) -> None:
+        entry = self._entries.pop(conversation_id, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+
+history_cache = HistoryCache(
+    max_bytes=settings.HISTORY_CACHE_MAX_BYTES,
+    max_messages=settings.HISTORY_CACHE_MAX_MESSAGES
+)
@@ -0,0 +1,155 @@
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Failures before the request reached the server, always safe to retry
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.connect_seconds = 0.0
+        self.connect_retries = 0
+        self.http_versions: Dict[str, int] = {}
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps an AsyncHTTPTransport with connect retries and reuse metrics.
+    
+    Connection failures are retried with full-jitter exponential backoff,
+    so a burst of callers hitting the same hiccup doesn't reconnect in
+    lockstep. httpcore's trace extension tells which requests had to open
+    a connection (and handshake TLS) instead of reusing a pooled one.
+    """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, retries: int, backoff: float):
+        self._transport = transport
+        self.retries = retries
+        self.backoff = backoff
+        self._hosts: Dict[str, _HostStats] = {}
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._hosts.setdefault(request.url.host, _HostStats())
+        stats.requests += 1
+        request.extensions["trace"] = self._tracer(stats, request.extensions.get("trace"))
+        
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+                break
+            except CONNECT_ERRORS:
+                if attempt >= self.retries:
+                    raise
+                stats.connect_retries += 1
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                attempt += 1
+        
+        version = response.extensions.get("http_version", b"HTTP/1.1").decode("ascii")
+        stats.http_versions[version] = stats.http_versions.get(version, 0) + 1
+        return response
+    
+    @staticmethod
+    def _tracer(stats: _HostStats, inner: Optional[Any]):
+        started = None
+        
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal started
+            if event_name == "connection.connect_tcp.started":
+                started = time.monotonic()
+            elif event_name == "connection.connect_tcp.complete":
+                stats.new_connections += 1
+            elif event_name == "connection.start_tls.complete":
+                stats.tls_handshakes += 1
+            
+            # Connection setup ends with the TCP connect, or the TLS handshake
+            if started is not None and event_name in (
+                "connection.start_tls.complete", "http11.send_request_headers.started",
+                "http2.send_request_headers.started"
+            ):
+                stats.connect_seconds += time.monotonic() - started
+                started = None
+            
+            if inner is not None:
+                await inner(event_name, info)
+        
+        return trace
+    
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Connection reuse per upstream host"""
+        return {
+            host: {
+                "requests": s.requests,
+                "new_connections": s.new_connections,
+                "tls_handshakes": s.tls_handshakes,
+                "reuse_rate": round(1 - s.new_connections / s.requests, 4) if s.requests else 0.0,
+                "connect_ms_avg": (
+                    round(s.connect_seconds / s.new_connections * 1000, 1) if s.new_connections else None
+                ),
+                "connect_retries": s.connect_retries,
+                "http_versions": dict(s.http_versions)
+            }
+            for host, s in self._hosts.items()
+        }
+
+
+def ai_timeout() -> httpx.Timeout:
+    """Per-phase timeouts; read is the wait for (the next part of) a response"""
+    return httpx.Timeout(
+        connect=settings.AI_CONNECT_TIMEOUT_SECONDS,
+        read=settings.AI_REQUEST_TIMEOUT_SECONDS,
+        write=settings.AI_WRITE_TIMEOUT_SECONDS,
+        pool=settings.AI_POOL_TIMEOUT_SECONDS
+    )
+
+
+def _http2_available() -> bool:
+    if not settings.AI_HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("AI_HTTP2_ENABLED is set but the h2 package is missing, using HTTP/1.1")
+        return False
+    return True
+
+
+def create_transport() -> InstrumentedTransport:
+    """Pooled transport sized by the AI_HTTP_* settings"""
+    return InstrumentedTransport(
+        httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            http2=_http2_available()
+        ),
+        retries=settings.AI_CONNECT_RETRIES,
+        backoff=settings.AI_CONNECT_RETRY_BACKOFF_SECONDS
+    )
+
+
+# Shared by the AI clients of all providers, so keep-alive connections
+# survive across requests and the pool limit is global
+ai_transport = create_transport()
+http_client = httpx.AsyncClient(transport=ai_transport, timeout=ai_timeout())
+
+
+async def close_http_client() -> None:
+    await http_client.aclose()
@@ -0,0 +1,145 @@
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class CompletionCache:
+    """
+    Exact-match cache of chat completion responses.
+    
+    Keyed on a stable hash of the request parameters that determine the
+    output. Bounded by entry count (least recently used goes first) and
+    by a per-entry TTL.
+    """
+    
+    KEY_FIELDS = ("model", "messages", "tools", "temperature", "max_tokens")
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @classmethod
+    def make_key(cls, **kwargs) -> str:
+        """Hash the cache-relevant request parameters"""
+        payload = {field: kwargs.get(field) for field in cls.KEY_FIELDS}
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response, or None on a miss or expired entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+    
+    def set(self, key: str, response: Any) -> None:
+        """Store a response, evicting the least recently used if full"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class CachedCompletions:
+    """chat.completions facade that serves repeated requests from the cache"""
+    
+    def __init__(self, completions: Any, cache: CompletionCache):
+        self._completions = completions
+        self.cache = cache
+    
+    async def create(self, cache: bool = True, **kwargs) -> Any:
+        """
+        Create a chat completion, using the cache when allowed.
+        
+        Args:
+            cache: Set False for calls whose answer must not be reused,
+                e.g. calls that may trigger tools or depend on live state
+            **kwargs: Passed through to the OpenAI SDK
+        
+        Returns:
+            The SDK response (a cached one with zero usage on a hit)
+        """
+        if not cache or not settings.LLM_CACHE_ENABLED or kwargs.get("stream"):
+            return await self._completions.create(**kwargs)
+        
+        key = self.cache.make_key(**kwargs)
+        response = self.cache.get(key)
+        if response is not None:
+            return self._without_usage(response)
+        
+        response = await self._completions.create(**kwargs)
+        self.cache.set(key, response)
+        return response
+    
+    @staticmethod
+    def _without_usage(response: Any) -> Any:
+        """
+        Copy of a cached response whose usage reports no tokens, so a hit
+        isn't charged to the caller's token budget a second time.
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return response
+        usage = copy.copy(usage)
+        usage.prompt_tokens = usage.completion_tokens = usage.total_tokens = 0
+        response = copy.copy(response)
+        response.usage = usage
+        return response
+
+
+class _CachedChat:
+    def __init__(self, completions: CachedCompletions):
+        self.completions = completions
+
+
+class CachedAIClient:
+    """
+    Wraps an AsyncOpenAI client with a completion cache.
+    
+    client.chat.completions.create() takes an extra cache= argument,
+    everything else is delegated to the wrapped client.
+    """
+    
+    def __init__(self, client: Any, cache: CompletionCache):
+        self._client = client
+        self.cache = cache
+        self.chat = _CachedChat(CachedCompletions(client.chat.completions, cache))
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
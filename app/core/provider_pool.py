@@ -0,0 +1,304 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import openai
+
+from app.core.config import settings
+
+
+# Most hedges saved up while latency is low, spent when it spikes
+HEDGE_BURST = 5.0
+
+# Provider trouble worth trying another provider for. Other errors (bad
+# request, authentication) would fail the same way everywhere.
+FAILOVER_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError  # any 5xx
+)
+
+
+class ProviderHealth:
+    """
+    Rolling health of one provider/model.
+    
+    Latency is an EWMA of successful calls (for streams, the time until the
+    response started), the error rate an EWMA of failures per call. Both are
+    forgotten after AI_PROVIDER_STATS_WINDOW_SECONDS without calls, so a
+    provider that recovered gets probed again.
+    """
+    
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.samples: "deque[float]" = deque(maxlen=settings.AI_HEDGE_SAMPLE_WINDOW)
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.last_call_at = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+    
+    def record_success(self, elapsed: float) -> None:
+        alpha = settings.AI_PROVIDER_EWMA_ALPHA
+        self.latency = elapsed if self.latency is None else (1 - alpha) * self.latency + alpha * elapsed
+        self.samples.append(elapsed)
+        self.error_rate *= 1 - alpha
+        self.consecutive_failures = 0
+        self.requests += 1
+        self.last_call_at = time.monotonic()
+    
+    def record_failure(self, cooldown: Optional[float] = None) -> None:
+        """
+        Args:
+            cooldown: Seconds to skip this provider for right away (rate
+                limits), otherwise only after too many failures in a row
+        """
+        alpha = settings.AI_PROVIDER_EWMA_ALPHA
+        self.error_rate = (1 - alpha) * self.error_rate + alpha
+        self.consecutive_failures += 1
+        self.requests += 1
+        self.failures += 1
+        self.last_call_at = time.monotonic()
+        
+        if cooldown is None and self.consecutive_failures >= settings.AI_PROVIDER_FAILURE_THRESHOLD:
+            cooldown = settings.AI_PROVIDER_COOLDOWN_SECONDS
+        if cooldown:
+            self.cooldown_until = max(self.cooldown_until, self.last_call_at + cooldown)
+    
+    def expire(self, now: float) -> None:
+        """Forget latency and errors that are older than the stats window"""
+        if self.last_call_at and now - self.last_call_at > settings.AI_PROVIDER_STATS_WINDOW_SECONDS:
+            self.latency = None
+            self.samples.clear()
+            self.error_rate = 0.0
+            self.consecutive_failures = 0
+    
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Latency percentile of recent successful calls, None with too few"""
+        if len(self.samples) < settings.AI_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+    
+    def cooling_down(self, now: float) -> bool:
+        return self.cooldown_until > now
+    
+    def score(self) -> float:
+        """
+        Expected cost of a call, lower is better.
+        
+        Latency inflated by the error rate. A provider without a latency
+        sample scores best so it gets measured, by one call at a time.
+        """
+        if self.latency is None:
+            unprobed = not self.in_flight and not self.consecutive_failures
+            return 0.0 if unprobed else float("inf")
+        return self.latency / max(1.0 - self.error_rate, 0.1)
+
+
+class Provider:
+    """An OpenAI-compatible endpoint and the model to use there"""
+    
+    def __init__(self, name: str, client: Any, model: str):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.health = ProviderHealth()
+
+
+class ProviderPool:
+    """
+    AsyncOpenAI look-alike spreading chat completions over several providers.
+    
+    Every call goes to the healthiest provider (see ProviderHealth.score)
+    with the model argument replaced by that provider's model. Timeouts,
+    connection errors, 429s and 5xx fail over to the next provider; a
+    provider that is rate limited or keeps failing sits out a cooldown.
+    Providers are listed in preference order, ties keep that order.
+    
+    Calls made with hedge=True are duplicated when they run longer than
+    the AI_HEDGE_PERCENTILE of the provider's recent latency: the copy goes
+    to the next best provider (or the same one if there is none), the first
+    answer wins and the other call is cancelled. At most AI_HEDGE_MAX_RATE
+    of hedgeable calls are duplicated.
+    """
+    
+    def __init__(self, providers: List[Provider], failover: bool = True):
+        self.providers = providers
+        self.failover = failover
+        self.failovers = 0
+        self.hedgeable = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._hedge_budget = 0.0
+        self.chat = _PoolChat(_PoolCompletions(self))
+    
+    def ranked(self) -> List[Provider]:
+        """Providers in the order to try them"""
+        if not self.failover:
+            return self.providers[:1]
+        
+        now = time.monotonic()
+        for provider in self.providers:
+            provider.health.expire(now)
+        
+        def rank(provider: Provider):
+            health = provider.health
+            if health.cooling_down(now):
+                # Still tried, as a last resort, soonest available first
+                return (1, health.cooldown_until)
+            return (0, health.score())
+        
+        return sorted(self.providers, key=rank)
+    
+    async def create(self, hedge: bool = False, **kwargs) -> Any:
+        """
+        chat.completions.create() on the best provider, failing over to
+        the others.
+        
+        Args:
+            hedge: Allow a duplicate request when this one is slow. Streams
+                are never hedged, their tokens are already on the way out
+            **kwargs: Passed through to the OpenAI SDK
+        
+        Raises:
+            The last provider's error when every provider failed
+        """
+        providers = self.ranked()
+        if hedge and settings.AI_HEDGING_ENABLED and not kwargs.get("stream"):
+            return await self._create_hedged(providers, kwargs)
+        return await self._create_with_failover(providers, kwargs)
+    
+    async def _create_with_failover(self, providers: List[Provider], kwargs: Dict[str, Any]) -> Any:
+        last_error: Optional[Exception] = None
+        for attempt, provider in enumerate(providers):
+            if attempt:
+                self.failovers += 1
+            try:
+                return await self._call(provider, kwargs)
+            except FAILOVER_ERRORS as e:
+                last_error = e
+        raise last_error
+    
+    async def _create_hedged(self, providers: List[Provider], kwargs: Dict[str, Any]) -> Any:
+        """Failover call, duplicated once if it outlasts the hedge delay"""
+        delay = providers[0].health.latency_percentile(settings.AI_HEDGE_PERCENTILE)
+        if delay is None:
+            # Not enough history to tell slow from normal
+            return await self._create_with_failover(providers, kwargs)
+        
+        self.hedgeable += 1
+        self._hedge_budget = min(self._hedge_budget + settings.AI_HEDGE_MAX_RATE, HEDGE_BURST)
+        
+        primary = asyncio.create_task(self._create_with_failover(providers, kwargs))
+        hedge: Optional[asyncio.Task] = None
+        try:
+            done, _ = await asyncio.wait(
+                {primary}, timeout=max(delay, settings.AI_HEDGE_MIN_DELAY_SECONDS)
+            )
+            if done or self._hedge_budget < 1.0:
+                return await primary
+            
+            self._hedge_budget -= 1.0
+            self.hedged += 1
+            # The hedge starts at the next provider, the same one when alone
+            hedge = asyncio.create_task(
+                self._create_with_failover(providers[1:] + providers[:1], kwargs)
+            )
+            
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both failed, report the original request's error
+            return primary.result()
+        finally:
+            # The slower call, or both when the caller was cancelled
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    async def _call(self, provider: Provider, kwargs: Dict[str, Any]) -> Any:
+        health = provider.health
+        health.in_flight += 1
+        started = time.monotonic()
+        try:
+            response = await provider.client.chat.completions.create(
+                **{**kwargs, "model": provider.model}
+            )
+        except FAILOVER_ERRORS as e:
+            health.record_failure(cooldown=self._retry_after(e))
+            raise
+        finally:
+            health.in_flight -= 1
+        
+        health.record_success(time.monotonic() - started)
+        return response
+    
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Cooldown for a rate limited provider, from Retry-After if sent"""
+        if not isinstance(error, openai.RateLimitError):
+            return None
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return settings.AI_PROVIDER_COOLDOWN_SECONDS
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-provider health for monitoring"""
+        now = time.monotonic()
+        return {
+            "failover_enabled": self.failover,
+            "failovers": self.failovers,
+            "hedging": {
+                "enabled": settings.AI_HEDGING_ENABLED,
+                "hedgeable": self.hedgeable,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": round(self.hedged / self.hedgeable, 4) if self.hedgeable else 0.0
+            },
+            "providers": [
+                {
+                    "name": provider.name,
+                    "model": provider.model,
+                    "latency_ms": _milliseconds(provider.health.latency),
+                    "p95_latency_ms": _milliseconds(provider.health.latency_percentile(95)),
+                    "error_rate": round(provider.health.error_rate, 4),
+                    "requests": provider.health.requests,
+                    "failures": provider.health.failures,
+                    "in_flight": provider.health.in_flight,
+                    "cooling_down": provider.health.cooling_down(now)
+                }
+                for provider in self.providers
+            ]
+        }
+    
+    def __getattr__(self, name: str) -> Any:
+        # Everything but chat completions goes to the preferred provider
+        return getattr(self.providers[0].client, name)
+
+
+def _milliseconds(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class _PoolCompletions:
+    def __init__(self, pool: ProviderPool):
+        self._pool = pool
+    
+    async def create(self, hedge: bool = False, **kwargs) -> Any:
+        return await self._pool.create(hedge=hedge, **kwargs)
+
+
+class _PoolChat:
+    def __init__(self, completions: _PoolCompletions):
+        self.completions = completions
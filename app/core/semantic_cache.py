@@ -0,0 +1,152 @@
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.utils.text_features import hash_embed, is_negated, key_terms, question_terms
+
+
+class SemanticCacheEntry(BaseModel):
+    """A previously answered question"""
+    id: str
+    question: str
+    answer: str
+    hits: int = 0
+    similarity: Optional[float] = None
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of answers to first-turn questions.
+    
+    Questions are reduced to the stemmed terms they are about (framing
+    words like "how", "policy" or "work" dropped), embedded locally with
+    hash_embed() and kept in a preallocated matrix, so a lookup is a single
+    matrix-vector product. Word overlap alone can't tell "I want to cancel"
+    from "I do not want to cancel", so a match must also have the same key
+    terms and the same negation as the question.
+    When full, the oldest entry is replaced.
+    """
+    
+    def __init__(self, max_entries: int, threshold: float, dim: int):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.dim = dim
+        self._matrix = np.zeros((max_entries, dim), dtype=np.float32)
+        self._active = np.zeros(max_entries, dtype=bool)
+        self._entries: Dict[int, SemanticCacheEntry] = {}
+        # (key terms, negated) of each slot's question
+        self._signatures: Dict[int, Tuple[FrozenSet[str], bool]] = {}
+        self._slots_by_id: Dict[str, int] = {}
+        self._order: Deque[int] = deque()
+        self._free: List[int] = list(range(max_entries - 1, -1, -1))
+        self.hits = 0
+        self.misses = 0
+    
+    def lookup(self, question: str) -> Optional[SemanticCacheEntry]:
+        """
+        Find the stored answer closest to question.
+        
+        Returns:
+            Copy of the entry with its similarity, or None below the threshold
+        """
+        if not self._entries:
+            self.misses += 1
+            return None
+        
+        scores = self._matrix @ self._embed(question)
+        scores[~self._active] = -1.0
+        signature = self._signature(question)
+        
+        # Best scoring entry above the threshold that asks the same thing
+        candidates = np.flatnonzero(scores >= self.threshold)
+        slot = next(
+            (
+                int(candidate) for candidate in candidates[np.argsort(-scores[candidates])]
+                if self._signatures[int(candidate)] == signature
+            ),
+            None
+        )
+        if slot is None:
+            self.misses += 1
+            return None
+        
+        entry = self._entries[slot]
+        entry.hits += 1
+        self.hits += 1
+        return entry.model_copy(update={"similarity": round(float(scores[slot]), 4)})
+    
+    def add(self, question: str, answer: str) -> str:
+        """
+        Store an answer.
+        
+        Returns:
+            Id of the new entry
+        """
+        if not self._free:
+            self._evict(self._order[0])
+        
+        slot = self._free.pop()
+        entry = SemanticCacheEntry(id=uuid.uuid4().hex, question=question, answer=answer)
+        self._matrix[slot] = self._embed(question)
+        self._active[slot] = True
+        self._entries[slot] = entry
+        self._signatures[slot] = self._signature(question)
+        self._slots_by_id[entry.id] = slot
+        self._order.append(slot)
+        return entry.id
+    
+    def invalidate(self, entry_id: str) -> bool:
+        """Remove one entry, e.g. after a policy answer went stale"""
+        slot = self._slots_by_id.get(entry_id)
+        if slot is None:
+            return False
+        self._evict(slot)
+        return True
+    
+    def entries(self) -> List[SemanticCacheEntry]:
+        """Stored entries, oldest first"""
+        return [self._entries[slot] for slot in self._order]
+    
+    def clear(self) -> None:
+        for slot in list(self._order):
+            self._evict(slot)
+    
+    def _evict(self, slot: int) -> None:
+        entry = self._entries.pop(slot)
+        del self._signatures[slot]
+        del self._slots_by_id[entry.id]
+        self._order.remove(slot)
+        self._active[slot] = False
+        self._matrix[slot] = 0.0
+        self._free.append(slot)
+    
+    def _embed(self, question: str) -> np.ndarray:
+        return hash_embed(" ".join(question_terms(question)), self.dim)
+    
+    @staticmethod
+    def _signature(question: str) -> Tuple[FrozenSet[str], bool]:
+        return key_terms(question), is_negated(question)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global cache instance (reuse across app)
+semantic_cache = SemanticCache(
+    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+    dim=settings.SEMANTIC_CACHE_DIM
+)
@@ -1,7 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import init_db, close_db, pool_stats
+from app.core.ai_client import ai_client, provider_pool
+from app.core.http_transport import ai_transport, close_http_client
+from app.core.history_cache import history_cache
+from app.tools.result_cache import tool_result_cache
+from app.agents.intent_classifier import load_intent_classifier
+from app.services.agent_service import speculation_stats
+from app.services.agent_registry import build_agent_registry
+from app.services.purge_service import start_purger, stop_purger
 from app.api.routes import chat, agents
 
 from fastapi import Request, status
@@ -64,6 +72,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -97,6 +106,13 @@ async def startup_event():
     print(f"Database: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'configured'}")
     print(f"AI Provider: {settings.AI_PROVIDER}")
     print(f"CORS Origins: {settings.CORS_ORIGINS}")
+    
+    classifier = load_intent_classifier()
+    print(f"Router classifier: {'loaded' if classifier else 'not trained, using LLM router'}")
+    
+    build_agent_registry()
+    
+    start_purger()
 
     
 
@@ -105,6 +121,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
+    await stop_purger()
+    await close_http_client()
     await close_db()
     print("Application shutdown complete")
 
@@ -124,6 +142,27 @@ async def health_check():
     }
 
 
+@app.get("/api/health/llm")
+async def llm_health():
+    """LLM client statistics"""
+    return {
+        "cache": ai_client.cache.stats(),
+        "providers": provider_pool.stats(),
+        "http": ai_transport.stats(),
+        "speculation": speculation_stats.stats()
+    }
+
+
+@app.get("/api/health/db")
+async def db_health():
+    """Database access statistics"""
+    return {
+        "pool": pool_stats(),
+        "history_cache": history_cache.stats(),
+        "tool_cache": tool_result_cache.stats()
+    }
+
+
 # Root endpoint
 @app.get("/")
 async def root():
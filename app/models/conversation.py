@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,6 +33,9 @@ class Conversation(Base):
 
     extra_data = Column(JSONB, nullable=True)
 
+    # Denormalized, maintained by the statements that insert messages
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     #timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate = datetime.utcnow)
@@ -43,4 +46,13 @@ class Conversation(Base):
 
 
     def __repr__(self):
-        return f"<Conversation {self.id} - {self.status}>"
\ No newline at end of file
+        return f"<Conversation {self.id} - {self.status}>"
+
+
+# Keyset pagination of a user's conversations, most recently active first
+Index(
+    "ix_conversations_user_id_updated_at_id",
+    Conversation.user_id,
+    Conversation.updated_at.desc(),
+    Conversation.id.desc()
+)
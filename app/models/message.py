@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -12,6 +12,10 @@ class Message(Base):
     Messagle table : conversation individula messages
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        # History of a conversation, newest first
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
     #primary key
     id = Column(UUID(as_uuid=True), primary_key = True, default=uuid.uuid4)
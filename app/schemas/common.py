@@ -20,6 +20,7 @@ class ConversationStatus(str, Enum):
     ACTIVE = "active"
     RESOLVED = "resolved"
     ARCHIVED = "archived"
+    DELETED = "deleted"  # Hidden, messages purged in the background
 
 
 class OrderStatus(str, Enum):
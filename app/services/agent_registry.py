@@ -0,0 +1,73 @@
+from typing import Any, Dict, Optional
+
+from app.agents import BaseAgent, RouterAgent, SupportAgent, OrderAgent, BillingAgent
+from app.services.fast_path import FastPath
+
+
+class AgentRegistry:
+    """
+    Process-wide set of agents, their tools and tool schemas.
+    
+    Everything here is built once and shared by all requests; nothing holds
+    a database session (ToolExecutor binds one per tool call). Agent
+    metadata is computed up front since it never changes while running.
+    """
+    
+    def __init__(self):
+        self.router = RouterAgent()
+        self.agents: Dict[str, BaseAgent] = {
+            "support": SupportAgent(),
+            "order": OrderAgent(),
+            "billing": BillingAgent()
+        }
+        self.fast_path = FastPath()
+        
+        # Serialize every agent's tool schemas now rather than on first use
+        for agent in self.agents.values():
+            agent.get_tool_schemas()
+        
+        self._info = {
+            agent_type: {
+                "name": agent.name,
+                "description": agent.description,
+                "tools": [tool.name for tool in agent.get_tools()]
+            }
+            for agent_type, agent in self.agents.items()
+        }
+    
+    def get_agent(self, agent_type: str) -> BaseAgent:
+        """The agent for agent_type, the support agent for unknown types"""
+        return self.agents.get(agent_type, self.agents["support"])
+    
+    def get_agent_info(self, agent_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get information about available agents.
+        
+        Args:
+            agent_type: Specific agent or None for all
+        
+        Returns:
+            Agent information
+        """
+        if agent_type:
+            info = self._info.get(agent_type)
+            if not info:
+                return {"error": f"Agent {agent_type} not found"}
+            return info
+        
+        return {"agents": list(self._info.values())}
+
+
+_registry: Optional[AgentRegistry] = None
+
+
+def build_agent_registry() -> AgentRegistry:
+    """Build the registry, called once at startup"""
+    global _registry
+    _registry = AgentRegistry()
+    return _registry
+
+
+def get_agent_registry() -> AgentRegistry:
+    """The registry built at startup, built now if startup didn't run (scripts)"""
+    return _registry or build_agent_registry()
@@ -1,28 +1,72 @@
-from typing import Dict, Any, List
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+from contextlib import suppress
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+from app.agents import TokenBudget
+from app.agents.intent_classifier import get_intent_classifier
+from app.core.config import settings
+from app.services.agent_registry import get_agent_registry
+from app.services.routing_policy import StickyRoutingPolicy
+
+
+class SpeculationStats:
+    """Process-wide counters for speculative specialist execution"""
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.wasted_tokens = 0
+    
+    def record(self, hit: bool, wasted_tokens: int = 0) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.wasted_tokens += wasted_tokens
+    
+    def stats(self) -> Dict[str, Any]:
+        attempts = self.hits + self.misses
+        return {
+            "enabled": settings.SPECULATIVE_ROUTING_ENABLED,
+            "attempts": attempts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / attempts, 4) if attempts else 0.0,
+            "wasted_tokens": self.wasted_tokens
+        }
+
+
+speculation_stats = SpeculationStats()
 
-from app.agents import RouterAgent, SupportAgent, OrderAgent, BillingAgent
 
 class AgentService:
     """
     Agent Service - Orchestrates multi-agent system.
     Routes queries to appropriate agents and manages conversation flow.
+    Agents and tools come from the process-wide AgentRegistry.
     """
 
-    def __init__(self, db:AsyncSession):
-        self.db = db
-        self.router = RouterAgent(db)
-        self.agents = {
-            "support":SupportAgent(db),
-            "order":OrderAgent(db),
-            "billing":BillingAgent(db)
-        }
-    async def process_message(self,message: str, conversation_history: List[Dict[str, str]] = None) -> Dict[str, Any]:
+    def __init__(self):
+        self.registry = get_agent_registry()
+        self.router = self.registry.router
+        self.agents = self.registry.agents
+        self.fast_path = self.registry.fast_path
+        self.sticky_policy = StickyRoutingPolicy()
+
+    async def process_message(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        summary: Optional[str] = None,
+        last_routing: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Process user message through multi-agent system.
         
         Flow:
-        1. Router analyzes query
+        0. Simple order/invoice lookups are answered by the fast path
+        1. Router analyzes query, unless the previous agent is kept; in
+           speculative mode the likely specialist starts alongside it
         2. Routes to appropriate specialist agent
         3. Specialist agent processes with tools
         4. Returns response
@@ -30,30 +74,36 @@ class AgentService:
         Args:
             message: User's message
             conversation_history: Previous messages
+            summary: Summary of the messages older than conversation_history
+            last_routing: Conversation's previous routing decision
             
         Returns:
             Response dict with content and metadata
         """
 
         try:
-            #step 1: route the query
-            routing_decision = await self.router.route(message, conversation_history)
-            agent_type = routing_decision["agent"]
-            confidence = routing_decision["confidence"]
-            reasoning = routing_decision["reasoning"]
+            #step 0: deterministic fast path, no LLM needed
+            fast_response = await self.fast_path.try_handle(message)
+            if fast_response:
+                return fast_response
+
+            #step 1: route the query, starting the likely specialist meanwhile
+            routing = self._sticky_routing(message, last_routing)
+            prior = None if routing else self._speculation_prior(message, last_routing)
+            if prior:
+                return await self._process_speculative(
+                    message, conversation_history, summary, prior
+                )
+            routing = routing or await self._router_decision(message, conversation_history)
 
             #step 2: get the appropriate agent
-            agent = self.agents.get(agent_type, self.agents["support"])
+            agent = self.registry.get_agent(routing["selected_agent"])
 
             #step 3: process wih specialist agent
-            response = await agent.process(message, conversation_history)
+            response = await agent.process(message, conversation_history, summary=summary)
 
             #step4: add routing metadata
-            response["routing"] = {
-                "selected_agent": agent_type,
-                "confidence":confidence,
-                "reasoning":reasoning
-            }
+            response["routing"] = routing
 
             return response
 
@@ -72,6 +122,175 @@ class AgentService:
             
             }
     
+    async def process_message_stream(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        summary: Optional[str] = None,
+        last_routing: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of process_message().
+        
+        Yields a "routing" event as soon as the router has decided, then the
+        specialist agent's events (tokens, tool calls) and finally a "result"
+        event carrying the same dict process_message() returns. Speculative
+        mode is not used here, tokens must not reach the client before the
+        router has confirmed the agent.
+        
+        Args:
+            message: User's message
+            conversation_history: Previous messages
+            summary: Summary of the messages older than conversation_history
+            last_routing: Conversation's previous routing decision
+        """
+        routing = {
+            "selected_agent": "support",
+            "confidence": 0.0,
+            "reasoning": "Error fallback"
+        }
+
+        try:
+            #step 0: deterministic fast path, no LLM needed
+            fast_response = await self.fast_path.try_handle(message)
+            if fast_response:
+                yield {"type": "routing", **fast_response["routing"]}
+                yield {"type": "token", "content": fast_response["content"]}
+                yield {"type": "result", "response": fast_response}
+                return
+
+            #step 1: route the query
+            routing = (
+                self._sticky_routing(message, last_routing)
+                or await self._router_decision(message, conversation_history)
+            )
+            yield {"type": "routing", **routing}
+
+            #step 2: stream from the specialist agent
+            agent = self.registry.get_agent(routing["selected_agent"])
+            async for event in agent.process_stream(
+                message, conversation_history, summary=summary
+            ):
+                if event["type"] == "result":
+                    event["response"]["routing"] = routing
+                yield event
+
+        except Exception as e:
+            #fallback to support agent on error
+            yield {"type": "result", "response": {
+                "content": "I apologize, but I encountered an error processing your request. How can I help you?",
+                "agent": "support",
+                "error": str(e),
+                "routing": routing
+            }}
+
+    def _sticky_routing(
+        self,
+        message: str,
+        last_routing: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Keep the conversation's previous agent when the sticky routing
+        policy allows it.
+        
+        Returns:
+            Routing metadata, or None when the router has to decide
+        """
+        if not self.sticky_policy.should_reuse(message, last_routing):
+            return None
+        return {
+            "selected_agent": last_routing["agent"],
+            "confidence": last_routing["confidence"],
+            "reasoning": "Sticky routing: follow-up for the previous agent",
+            "sticky": True
+        }
+
+    async def _router_decision(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> Dict[str, Any]:
+        """Ask the router and return routing metadata"""
+        routing_decision = await self.router.route(message, conversation_history)
+        return {
+            "selected_agent": routing_decision["agent"],
+            "confidence": routing_decision["confidence"],
+            "reasoning": routing_decision["reasoning"],
+            "sticky": False
+        }
+
+    def _speculation_prior(
+        self,
+        message: str,
+        last_routing: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """
+        Agent worth starting before the router has decided.
+        
+        The conversation's previous agent unless the message shifts topic,
+        otherwise (and for new conversations) the local classifier's best
+        guess. None when speculation is disabled or the router would answer
+        locally anyway.
+        """
+        if not settings.SPECULATIVE_ROUTING_ENABLED:
+            return None
+        previous = (last_routing or {}).get("agent")
+        if previous in self.agents and not self.sticky_policy.is_topic_shift(message, previous):
+            return previous
+        
+        classifier = get_intent_classifier()
+        if not classifier:
+            return None
+        agent_type, confidence = classifier.predict(message)
+        if confidence >= settings.ROUTER_CLASSIFIER_THRESHOLD:
+            return None
+        return agent_type if agent_type in self.agents else None
+
+    async def _process_speculative(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        summary: Optional[str],
+        prior: str
+    ) -> Dict[str, Any]:
+        """
+        Run the router and the likely specialist concurrently.
+        
+        The specialist may call the LLM right away but its tools wait for
+        the router's confirmation, so nothing acts on live data for the
+        wrong agent. If the router picks another agent the speculative run
+        is cancelled and the chosen agent processes the message.
+        """
+        confirmed = asyncio.Event()
+        budget = TokenBudget()
+        speculative_agent = self.agents[prior]
+        specialist_task = asyncio.create_task(speculative_agent.process(
+            message, conversation_history, budget, summary, tool_gate=confirmed
+        ))
+        
+        try:
+            routing = await self._router_decision(message, conversation_history)
+        except BaseException:
+            specialist_task.cancel()
+            raise
+        
+        agent = self.registry.get_agent(routing["selected_agent"])
+        if agent is speculative_agent:
+            confirmed.set()
+            speculation_stats.record(hit=True)
+            response = await specialist_task
+        else:
+            specialist_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await specialist_task
+            # Completions still in flight when cancelled are not counted
+            speculation_stats.record(hit=False, wasted_tokens=budget.total_tokens)
+            response = await agent.process(message, conversation_history, summary=summary)
+        
+        routing["speculative"] = True
+        response["routing"] = routing
+        return response
+
     def get_agent_info(self, agent_type: str = None) -> Dict[str, Any]:
         """
         Get information about available agents.
@@ -82,24 +301,4 @@ class AgentService:
         Returns:
             Agent information
         """
-        if agent_type:
-            agent = self.agents.get(agent_type)
-            if not agent:
-                return {"error":f"Agent {agent_type} not found"}
-            return {
-                "name":agent.name,
-                "description":agent.description,
-                "tools": [tool.name for tool in agent.get_tools()]
-            }
-
-        #return all agents
-        return {
-            "agents":[
-                {
-                    "name":agent.name,
-                    "description":agent.description,
-                    "tools":[tool.name for tool in agent.get_tools()]
-                }
-                for agent in self.agents.values()
-            ]
-        }
\ No newline at end of file
+        return self.registry.get_agent_info(agent_type)
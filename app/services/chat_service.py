@@ -1,18 +1,41 @@
-from typing import Dict, Any, List, Optional
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncIterator
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import mark_written
 from app.services.agent_service import AgentService
 from app.services.conversation_service import ConversationService
+from app.services.identity_service import IdentityResolver
+from app.tools.loaders import loader_scope
+from app.services.summary_service import SummaryService, schedule_summary_update
 from app.schemas.common import MessageRole, AgentType
 
 
+class ChatTurn(BaseModel):
+    """A chat turn whose user message is saved, handed on to save the reply"""
+    conversation_id: str
+    user_id: str
+    message: str
+    received_at: datetime
+    is_new: bool = False
+    title: Optional[str] = None
+    history: List[Dict[str, str]] = []
+    summary: Optional[str] = None
+    unsummarized: int = 0
+    last_routing: Optional[Dict[str, Any]] = None
+
+
 class ChatService:
     """Main service for handling chat interactions"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.agent_service = AgentService(db)
+        self.agent_service = AgentService()
         self.conversation_service = ConversationService(db)
+        self.identity_resolver = IdentityResolver(db)
     
     async def send_message(
         self,
@@ -27,56 +50,166 @@ class ChatService:
             message: User's message
             conversation_id: Existing conversation or None for new
             user_id: User ID or None for default user
-            
+        
         Returns:
             Dict with response and metadata
         """
-        # Get or create user
-        if not user_id:
-            user = await self.conversation_service.get_or_create_default_user()
-            user_id = str(user.id)
+        turn = await self._prepare_turn(message, conversation_id, user_id)
+        
+        # Process through agents, tool lookups of this turn are batched
+        with loader_scope():
+            agent_response = await self.agent_service.process_message(
+                message=message,
+                conversation_history=turn.history,
+                summary=turn.summary,
+                last_routing=turn.last_routing
+            )
+        
+        response = await self._save_turn(turn, agent_response)
+        # The turn added the user message and the reply
+        schedule_summary_update(turn.conversation_id, turn.unsummarized + 2)
+        
+        return response
+    
+    async def send_message_stream(
+        self,
+        message: str,
+        conversation_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of send_message().
+        
+        Yields a "conversation" event first, then routing, tool call and token
+        events as they arrive. The user's message (and a new conversation) is
+        saved before anything is streamed, the reply once the agent has
+        finished; a final "done" event carries the same payload
+        send_message() returns.
         
-        # Get or create conversation
+        Args:
+            message: User's message
+            conversation_id: Existing conversation or None for new
+            user_id: User ID or None for default user
+        """
+        turn = await self._prepare_turn(message, conversation_id, user_id)
+        yield {"type": "conversation", "conversation_id": turn.conversation_id}
+        
+        agent_response = None
+        with loader_scope():
+            async for event in self.agent_service.process_message_stream(
+                message=message,
+                conversation_history=turn.history,
+                summary=turn.summary,
+                last_routing=turn.last_routing
+            ):
+                if event["type"] == "result":
+                    agent_response = event["response"]
+                    continue
+                yield event
+        
+        response = await self._save_turn(turn, agent_response)
+        # The turn added the user message and the reply
+        schedule_summary_update(turn.conversation_id, turn.unsummarized + 2)
+        yield {"type": "done", **response}
+    
+    async def _prepare_turn(
+        self,
+        message: str,
+        conversation_id: Optional[str],
+        user_id: Optional[str]
+    ) -> ChatTurn:
+        """
+        Resolve user and conversation, load history, save the user message.
+        
+        The user's message is recorded (creating a new conversation) before
+        any LLM call, so it survives a failed or abandoned reply and the
+        conversation id handed to the client exists right away. The
+        transaction is committed before returning so no connection is held
+        during the LLM call.
+        
+        Only the last MAX_CONTEXT_MESSAGES messages are loaded, older ones
+        can't fit the agents' context anyway. Messages already folded into
+        the conversation summary are left out, the summary stands in for
+        them.
+        """
+        received_at = datetime.utcnow()
+        
+        # Validate the user, or get the default one (cached)
+        user_id = await self.identity_resolver.resolve(user_id)
+        
+        conversation = None
         if conversation_id:
             conversation = await self.conversation_service.get_conversation(conversation_id)
-            if not conversation:
-                conversation = await self.conversation_service.create_conversation(
-                    user_id=user_id,
-                    title="New Chat"
-                )
-        else:
-            conversation = await self.conversation_service.create_conversation(
+        
+        if not conversation:
+            turn = ChatTurn(
+                conversation_id=str(uuid.uuid4()),
                 user_id=user_id,
-                title=message[:50]  # Use first 50 chars as title
+                message=message,
+                received_at=received_at,
+                is_new=True,
+                # Use first 50 chars as title, unless the given id was unknown
+                title="New Chat" if conversation_id else message[:50]
             )
+            await self._save_user_message(turn)
+            return turn
         
-        conversation_id = str(conversation.id)
+        summary, summarized_until = SummaryService.get_summary(conversation)
         
-        # Save user message
-        user_message = await self.conversation_service.add_message(
-            conversation_id=conversation_id,
-            role=MessageRole.USER,
-            content=message
+        # Get the recent conversation history for context
+        rows = await self.conversation_service.get_recent_history(
+            conversation_id,
+            limit=settings.MAX_CONTEXT_MESSAGES,
+            after=summarized_until
         )
         
-        # Get conversation history for context
-        messages = await self.conversation_service.get_conversation_messages(conversation_id)
-        
-        # Format history for AI (exclude current message)
+        # Format history for AI
         conversation_history = [
             {
-                "role": msg.role.value,
-                "content": msg.content
+                "role": role.value,
+                "content": content
             }
-            for msg in messages[:-1]  # Exclude the message we just added
+            for role, content in rows
         ]
         
-        # Process through agents
-        agent_response = await self.agent_service.process_message(
+        turn = ChatTurn(
+            conversation_id=str(conversation.id),
+            user_id=user_id,
             message=message,
-            conversation_history=conversation_history
+            received_at=received_at,
+            history=conversation_history,
+            summary=summary,
+            unsummarized=SummaryService.unsummarized_count(conversation),
+            last_routing=(conversation.extra_data or {}).get("routing")
         )
-        
+        await self._save_user_message(turn)
+        return turn
+    
+    async def _save_user_message(self, turn: ChatTurn) -> None:
+        """Record the user's message, and the conversation if it is new"""
+        await self.conversation_service.record_turn(
+            conversation_id=turn.conversation_id,
+            messages=[
+                {
+                    "role": MessageRole.USER,
+                    "content": turn.message,
+                    "created_at": turn.received_at
+                }
+            ],
+            new_conversation={"user_id": turn.user_id, "title": turn.title} if turn.is_new else None
+        )
+        # The user's conversation list changed too
+        mark_written(turn.user_id)
+    
+    async def _save_turn(
+        self,
+        turn: ChatTurn,
+        agent_response: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Save the reply and the routing decision in one transaction, build
+        the API response.
+        """
         # Determine agent type
         agent_type_str = agent_response.get("agent", "support")
         agent_type_map = {
@@ -87,20 +220,43 @@ class ChatService:
         }
         agent_type = agent_type_map.get(agent_type_str, AgentType.SUPPORT)
         
-        # Save assistant message
-        assistant_message = await self.conversation_service.add_message(
-            conversation_id=conversation_id,
-            role=MessageRole.ASSISTANT,
-            content=agent_response["content"],
-            agent_type=agent_type,
-            tool_calls=agent_response.get("tool_calls")
+        # Remember the routing decision for sticky routing of follow-ups
+        extra_data = None
+        routing = agent_response.get("routing")
+        if routing and not agent_response.get("error"):
+            sticky_turns = (turn.last_routing or {}).get("sticky_turns", 0) + 1 if routing.get("sticky") else 0
+            extra_data = {
+                "routing": {
+                    "agent": routing["selected_agent"],
+                    "confidence": routing["confidence"],
+                    "sticky_turns": sticky_turns
+                }
+            }
+        
+        [assistant_message_id] = await self.conversation_service.record_turn(
+            conversation_id=turn.conversation_id,
+            messages=[
+                {
+                    "role": MessageRole.ASSISTANT,
+                    "content": agent_response["content"],
+                    "agent_type": agent_type,
+                    "tool_calls": agent_response.get("tool_calls"),
+                    # Lets train_router.py tell error replies from real answers
+                    "extra_data": {
+                        "routing": routing,
+                        "error": agent_response.get("error")
+                    }
+                }
+            ],
+            extra_data=extra_data
         )
+        mark_written(turn.user_id)
         
         return {
-            "message_id": str(assistant_message.id),
-            "conversation_id": conversation_id,
+            "message_id": assistant_message_id,
+            "conversation_id": turn.conversation_id,
             "content": agent_response["content"],
             "agent": agent_response["agent"],
             "tool_calls": agent_response.get("tool_calls"),
             "routing": agent_response.get("routing")
-        }
\ No newline at end of file
+        }
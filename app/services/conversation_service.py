@@ -1,13 +1,21 @@
-from typing import List, Optional
-from sqlalchemy import select, desc, func
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import select, insert, update, desc, func, literal, text, tuple_, union_all
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import uuid
 
+from app.core.config import settings
+from app.core.database import mark_written
+from app.core.history_cache import history_cache
 from app.models.conversation import Conversation
 from app.models.message import Message
-from app.models.user import User
 from app.schemas.common import ConversationStatus, MessageRole
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+class ConversationNotFoundError(ValueError):
+    """A conversation doesn't exist or was deleted"""
 
 
 class ConversationService:
@@ -16,27 +24,12 @@ class ConversationService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def create_conversation(
-        self, 
-        user_id: str,
-        title: Optional[str] = None
-    ) -> Conversation:
-        """Create a new conversation"""
-        conversation = Conversation(
-            user_id=user_id,
-            title=title or "New Conversation",
-            status=ConversationStatus.ACTIVE
-        )
-        
-        self.db.add(conversation)
-        await self.db.commit()
-        await self.db.refresh(conversation)
-        
-        return conversation
-    
     async def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
-        """Get conversation by ID"""
-        stmt = select(Conversation).where(Conversation.id == conversation_id)
+        """Get conversation by ID (deleted conversations are not returned)"""
+        stmt = select(Conversation).where(
+            Conversation.id == conversation_id,
+            Conversation.status != ConversationStatus.DELETED
+        )
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
     
@@ -44,20 +37,47 @@ class ConversationService:
         self, 
         user_id: str,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Conversation]:
-        """Get all conversations for a user"""
+        """
+        Get conversations for a user, most recently active first.
+        
+        With a cursor (see next_cursor()) the page is found by a keyset
+        condition on (updated_at, id), which stays fast however deep the
+        client pages; offset is kept for older clients.
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
         stmt = (
             select(Conversation)
-            .where(Conversation.user_id == user_id)
-            .order_by(desc(Conversation.updated_at))
+            .where(
+                Conversation.user_id == user_id,
+                Conversation.status != ConversationStatus.DELETED
+            )
+            .order_by(desc(Conversation.updated_at), desc(Conversation.id))
             .limit(limit)
-            .offset(offset)
         )
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Conversation.updated_at, Conversation.id) < tuple_(updated_at, conversation_id)
+            )
+        else:
+            stmt = stmt.offset(offset)
         
         result = await self.db.execute(stmt)
         return result.scalars().all()
     
+    @staticmethod
+    def next_cursor(conversations: List[Conversation], limit: int) -> Optional[str]:
+        """Cursor for the page after conversations, None on the last page"""
+        if len(conversations) < limit:
+            return None
+        last = conversations[-1]
+        return encode_cursor(last.updated_at, last.id)
+    
     async def get_conversation_messages(
         self, 
         conversation_id: str
@@ -72,65 +92,204 @@ class ConversationService:
         result = await self.db.execute(stmt)
         return result.scalars().all()
     
-    async def add_message(
+    async def get_recent_history(
         self,
         conversation_id: str,
-        role: MessageRole,
-        content: str,
-        agent_type: Optional[str] = None,
-        tool_calls: Optional[dict] = None
-    ) -> Message:
-        """Add a message to conversation"""
-        message = Message(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            agent_type=agent_type,
-            tool_calls=tool_calls
-        )
+        limit: int,
+        after: Optional[datetime] = None
+    ) -> List[Tuple[MessageRole, str]]:
+        """
+        Get the last messages of a conversation as (role, content) rows.
         
-        self.db.add(message)
+        Served from the in-process history cache when possible. Otherwise
+        reads newest first with a LIMIT, served by the (conversation_id,
+        created_at) index, skips ORM hydration and fills the cache.
         
-        # Update conversation timestamp
-        conversation = await self.get_conversation(conversation_id)
-        if conversation:
-            conversation.updated_at = datetime.utcnow()
+        Args:
+            conversation_id: Conversation to read
+            limit: Maximum number of messages
+            after: Only messages created after this time
         
-        await self.db.commit()
-        await self.db.refresh(message)
+        Returns:
+            Rows in chronological order
+        """
+        if settings.HISTORY_CACHE_ENABLED:
+            cached = history_cache.get(conversation_id, limit, after)
+            if cached is not None:
+                return cached
         
-        return message
+        stmt = (
+            select(Message.role, Message.content, Message.created_at)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(desc(Message.created_at))
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(Message.created_at > after)
+        
+        result = await self.db.execute(stmt)
+        rows = [tuple(row) for row in reversed(result.all())]
+        
+        if settings.HISTORY_CACHE_ENABLED:
+            history_cache.put(conversation_id, rows, floor=after, complete=len(rows) < limit)
+        return [(role, content) for role, content, _ in rows]
     
-    async def delete_conversation(self, conversation_id: str) -> bool:
-        """Delete a conversation"""
-        conversation = await self.get_conversation(conversation_id)
+    async def update_extra_data(
+        self,
+        conversation_id: str,
+        patch: Dict[str, Any]
+    ) -> None:
+        """
+        Merge keys into Conversation.extra_data.
         
-        if not conversation:
-            return False
+        The merge happens in the database (jsonb ||), so concurrent writers
+        updating different keys don't overwrite each other. updated_at is
+        left alone, this is bookkeeping rather than conversation activity.
+        """
+        stmt = (
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                extra_data=self._merged_extra_data(patch),
+                updated_at=Conversation.updated_at
+            )
+        )
+        await self.db.execute(stmt)
+        mark_written(conversation_id)
+    
+    async def record_turn(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        extra_data: Optional[Dict[str, Any]] = None,
+        new_conversation: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """
+        Persist a chat turn in one transaction and commit once.
+        
+        Ids and timestamps are generated here, so nothing has to be read
+        back, and everything goes out as a single statement: the message
+        insert selects from a CTE UPDATE that bumps updated_at and
+        message_count and merges extra_data, or the conversation insert is
+        a CTE of the message insert for a new conversation.
+        
+        Args:
+            conversation_id: Conversation the messages belong to
+            messages: Message columns (role, content and optionally
+                agent_type, tool_calls, extra_data, created_at), oldest
+                first
+            extra_data: Keys to merge into Conversation.extra_data
+            new_conversation: user_id and title when the conversation
+                doesn't exist yet
+        
+        Returns:
+            Ids of the inserted messages
+        
+        Raises:
+            ConversationNotFoundError: If an existing conversation was
+                deleted (or never existed), nothing is written then
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "agent_type": None,
+                "tool_calls": None,
+                "extra_data": None,
+                "created_at": now,
+                **message,
+                "id": uuid.uuid4(),
+                "conversation_id": conversation_id
+            }
+            for message in messages
+        ]
+        stmt = insert(Message).values(rows)
         
-        await self.db.delete(conversation)
+        if new_conversation:
+            conversation = {
+                "id": conversation_id,
+                "user_id": new_conversation["user_id"],
+                "title": new_conversation.get("title") or "New Conversation",
+                "status": ConversationStatus.ACTIVE,
+                "message_count": len(rows),
+                "created_at": now,
+                "updated_at": now
+            }
+            if extra_data:
+                conversation["extra_data"] = extra_data
+            # Foreign keys are checked at the end of the statement, after the CTE
+            stmt = stmt.add_cte(insert(Conversation).values(conversation).cte("new_conversation"))
+        else:
+            updated = (
+                update(Conversation)
+                .where(
+                    Conversation.id == conversation_id,
+                    Conversation.status != ConversationStatus.DELETED
+                )
+                .values(
+                    updated_at=now,
+                    message_count=Conversation.message_count + len(rows),
+                    extra_data=(
+                        self._merged_extra_data(extra_data) if extra_data
+                        else Conversation.extra_data
+                    )
+                )
+                .returning(Conversation.id)
+                .cte("updated_conversation")
+            )
+            # Messages are selected from the UPDATE's result, so none are
+            # inserted when the conversation is gone or was deleted
+            columns = list(rows[0])
+            stmt = insert(Message).from_select(columns, union_all(*(
+                select(*(
+                    literal(row[column], Message.__table__.c[column].type).label(column)
+                    for column in columns
+                )).select_from(updated)
+                for row in rows
+            )))
+        
+        result = await self.db.execute(stmt.returning(Message.id))
+        if not result.all():
+            raise ConversationNotFoundError(f"Conversation {conversation_id} not found")
         await self.db.commit()
+        mark_written(conversation_id)
         
-        return True
-    
-    async def get_or_create_default_user(self) -> User:
-        """Get or create a default user for testing"""
-        # Try to find existing user
-        stmt = select(User).limit(1)
-        result = await self.db.execute(stmt)
-        user = result.scalar_one_or_none()
+        cached_rows = [(row["role"], row["content"], row["created_at"]) for row in rows]
+        if new_conversation:
+            history_cache.put(conversation_id, cached_rows, floor=None, complete=True)
+        else:
+            history_cache.append(conversation_id, cached_rows)
         
-        if user:
-            return user
+        return [str(row["id"]) for row in rows]
+    
+    @staticmethod
+    def _merged_extra_data(patch: Dict[str, Any]):
+        """SQL expression merging patch into the stored extra_data"""
+        return func.coalesce(
+            Conversation.extra_data, text("'{}'::jsonb")
+        ).op("||", return_type=JSONB)(literal(patch, JSONB))
+    
+    async def delete_conversation(self, conversation_id: str) -> bool:
+        """
+        Soft-delete a conversation.
         
-        # Create default user
-        user = User(
-            email="demo@example.com",
-            name="Demo User"
+        Marks it DELETED in a single UPDATE, which hides it from every read;
+        its messages and row are removed later by the background purger.
+        """
+        stmt = (
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.status != ConversationStatus.DELETED
+            )
+            .values(status=ConversationStatus.DELETED, updated_at=datetime.utcnow())
+            .returning(Conversation.id)
         )
+        result = await self.db.execute(stmt)
+        if result.scalar_one_or_none() is None:
+            return False
         
-        self.db.add(user)
         await self.db.commit()
-        await self.db.refresh(user)
+        mark_written(conversation_id)
+        history_cache.invalidate(conversation_id)
         
-        return user
\ No newline at end of file
+        return True
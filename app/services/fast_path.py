@@ -0,0 +1,263 @@
+import re
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import read_session
+from app.models.order import Order
+from app.tools.base_tool import BaseTool, ToolResult
+from app.tools.order_tools import FetchOrderDetailsTool, CheckDeliveryStatusTool
+from app.tools.billing_tools import GetInvoiceDetailsTool
+from app.utils.text_features import STOPWORDS, is_negated
+
+
+ORDER_NUMBER = re.compile(r"\bORD-\d{4}-\d{3,}\b", re.IGNORECASE)
+INVOICE_NUMBER = re.compile(r"\bINV-\d{4}-\d{3,}\b", re.IGNORECASE)
+TRACKING_NUMBER = re.compile(r"\bTRK\d{6,}\b", re.IGNORECASE)
+_WORD = re.compile(r"[a-z]+")
+
+STATUS_WORDS = {"status", "where", "track", "tracking", "shipped", "ship", "shipping",
+                "deliver", "delivered", "delivery", "arrive", "arriving", "when", "eta"}
+DETAIL_WORDS = {"details", "detail", "items", "item", "contents", "contain", "total", "bought"}
+INVOICE_WORDS = {"invoice", "payment", "paid", "amount", "bill", "billing"}
+REFUND_WORDS = {"refund", "refunded", "refunds"}
+
+# Words that only name the identifier ("order ORD-2024-002")
+IDENTIFIER_WORDS = {"order", "invoice", "tracking", "number"}
+
+# Anything that asks for an action, an explanation or a complaint needs an
+# agent, and so does any negation (see text_features.is_negated)
+AMBIGUOUS_WORDS = {"cancel", "modify", "change", "update", "return", "replace", "exchange",
+                   "why", "wrong", "damaged", "broken", "late", "complaint", "address", "but",
+                   "also", "instead", "help", "still", "yet", "again", "twice", "charged",
+                   "charge", "double", "missing", "lost", "stuck", "delayed", "resend", "send",
+                   "receipt", "money", "problem", "issue", "happened"}
+
+ORDER_STATUS_TEXT = {
+    "pending": "has been placed and is awaiting confirmation",
+    "confirmed": "is confirmed and being prepared for shipment",
+    "shipped": "has been shipped and is on its way",
+    "delivered": "has been delivered",
+    "cancelled": "has been cancelled"
+}
+
+
+class Intent(BaseModel):
+    """A recognized request that maps to a single tool call"""
+    name: str
+    agent: str
+    tool: str
+    arguments: Dict[str, Any]
+
+
+class IntentExtractor:
+    """
+    Recognizes simple lookups by order, invoice or tracking number.
+    
+    Returns an intent only when the message mentions exactly one identifier
+    and clearly asks for a lookup: it is just the identifier, or it has a
+    status, detail, invoice or refund word. Negations, complaints and
+    requests for action ("hasn't arrived", "charged twice", "resend") and
+    several questions at once go through the agents.
+    """
+    
+    def extract(self, message: str) -> Optional[Intent]:
+        if len(message.split()) > settings.FAST_PATH_MAX_WORDS or is_negated(message):
+            return None
+        
+        orders = {m.upper() for m in ORDER_NUMBER.findall(message)}
+        invoices = {m.upper() for m in INVOICE_NUMBER.findall(message)}
+        trackings = {m.upper() for m in TRACKING_NUMBER.findall(message)}
+        if len(orders) + len(invoices) + len(trackings) != 1:
+            return None
+        
+        # Words around the identifier, apostrophes dropped ("hasn't" -> hasnt)
+        text = TRACKING_NUMBER.sub(" ", INVOICE_NUMBER.sub(" ", ORDER_NUMBER.sub(" ", message)))
+        words = set(_WORD.findall(text.lower().replace("'", "").replace("\u2019", "")))
+        if words & AMBIGUOUS_WORDS:
+            return None
+        lookup_words = STATUS_WORDS | DETAIL_WORDS | INVOICE_WORDS | REFUND_WORDS
+        if not words & lookup_words and words - STOPWORDS - IDENTIFIER_WORDS:
+            # Neither a lookup question nor just the identifier
+            return None
+        
+        if orders:
+            order_number = orders.pop()
+            if words & (REFUND_WORDS | INVOICE_WORDS):
+                return None
+            if words & DETAIL_WORDS and not words & STATUS_WORDS:
+                return Intent(
+                    name="order_details",
+                    agent="order",
+                    tool="fetch_order_details",
+                    arguments={"order_number": order_number}
+                )
+            return Intent(
+                name="order_status",
+                agent="order",
+                tool="check_delivery_status",
+                arguments={"order_number": order_number}
+            )
+        
+        if trackings:
+            if words & (REFUND_WORDS | INVOICE_WORDS | DETAIL_WORDS):
+                return None
+            return Intent(
+                name="tracking_status",
+                agent="order",
+                tool="check_delivery_status",
+                arguments={"tracking_number": trackings.pop()}
+            )
+        
+        invoice_number = invoices.pop()
+        if words & REFUND_WORDS:
+            return Intent(
+                name="refund_status",
+                agent="billing",
+                tool="get_invoice_details",
+                arguments={"invoice_number": invoice_number}
+            )
+        return Intent(
+            name="invoice_details",
+            agent="billing",
+            tool="get_invoice_details",
+            arguments={"invoice_number": invoice_number}
+        )
+
+
+class FastPath:
+    """
+    Answers simple order/invoice lookups without any LLM call.
+    
+    The extracted intent is dispatched straight to the matching tool and the
+    result is rendered from a template. try_handle() returns None whenever
+    the full agent pipeline should handle the message instead.
+    """
+    
+    def __init__(self):
+        self.extractor = IntentExtractor()
+        tools: List[BaseTool] = [
+            FetchOrderDetailsTool(),
+            CheckDeliveryStatusTool(),
+            GetInvoiceDetailsTool()
+        ]
+        self.tools = {tool.name: tool for tool in tools}
+    
+    async def try_handle(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Handle message deterministically if it is a recognized lookup.
+        
+        Args:
+            message: User's message
+        
+        Returns:
+            Response dict shaped like AgentService.process_message(), or None
+        """
+        if not settings.FAST_PATH_ENABLED:
+            return None
+        
+        intent = self.extractor.extract(message)
+        if not intent:
+            return None
+        
+        tool = self.tools[intent.tool]
+        arguments = dict(intent.arguments)
+        
+        # Lookups only, served by the read replica
+        async with read_session(tool.consistency_key(**arguments)) as session:
+            if "tracking_number" in arguments:
+                order_number = await self._order_number_for_tracking(
+                    session, arguments.pop("tracking_number")
+                )
+                if not order_number:
+                    return None
+                arguments["order_number"] = order_number
+            
+            result = await tool.with_session(session).run(**arguments)
+        
+        if not result.success and not (result.error or "").endswith("not found"):
+            # Database trouble, let the agent deal with it
+            return None
+        
+        return {
+            "content": self._render(intent, arguments, result),
+            "agent": intent.agent,
+            "tool_calls": [{"tool": intent.tool, "arguments": arguments}],
+            "routing": {
+                "selected_agent": intent.agent,
+                "confidence": 1.0,
+                "reasoning": f"Fast path: {intent.name}"
+            }
+        }
+    
+    @staticmethod
+    async def _order_number_for_tracking(session: AsyncSession, tracking_number: str) -> Optional[str]:
+        stmt = select(Order.order_number).where(Order.tracking_number == tracking_number)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+    
+    def _render(self, intent: Intent, arguments: Dict[str, Any], result: ToolResult) -> str:
+        """Render the templated answer for an intent"""
+        if intent.agent == "order":
+            order_number = arguments["order_number"]
+            if not result.success:
+                return (
+                    f"I couldn't find an order with the number {order_number}. "
+                    "Could you please double-check it?"
+                )
+            return self._render_order(intent, order_number, result.data)
+        
+        invoice_number = arguments["invoice_number"]
+        if not result.success:
+            return (
+                f"I couldn't find an invoice with the number {invoice_number}. "
+                "Could you please double-check it?"
+            )
+        return self._render_invoice(intent, result.data)
+    
+    @staticmethod
+    def _render_order(intent: Intent, order_number: str, data: Dict[str, Any]) -> str:
+        status = data["status"]
+        text = f"Your order {order_number} {ORDER_STATUS_TEXT.get(status, f'is {status}')}."
+        
+        if intent.name == "order_details":
+            items = ", ".join(
+                f"{item.get('name')} x{item.get('quantity', 1)}" for item in data.get("items") or []
+            )
+            if items:
+                text += f" Items: {items}."
+            text += f" Order total: ₹{data['total_amount']:,.2f}."
+        
+        if data.get("tracking_number") and status in ("shipped", "delivered"):
+            text += f" Tracking number: {data['tracking_number']}."
+        if data.get("estimated_delivery") and status in ("confirmed", "shipped"):
+            text += f" Estimated delivery: {data['estimated_delivery']}."
+        return text
+    
+    @staticmethod
+    def _render_invoice(intent: Intent, data: Dict[str, Any]) -> str:
+        invoice_number = data["invoice_number"]
+        amount = data["amount"]
+        refund_amount = data.get("refund_amount") or 0
+        status = data["status"]
+        
+        if intent.name == "refund_status":
+            if status == "refunded":
+                return f"Invoice {invoice_number} has been fully refunded (₹{refund_amount:,.2f})."
+            if status == "partially_refunded":
+                return (
+                    f"Invoice {invoice_number} has been partially refunded: "
+                    f"₹{refund_amount:,.2f} of ₹{amount:,.2f}."
+                )
+            return (
+                f"No refund has been issued for invoice {invoice_number} "
+                f"(payment status: {status.replace('_', ' ')}). "
+                "Refunds take 5-7 business days to process once approved."
+            )
+        
+        text = f"Invoice {invoice_number}: ₹{amount:,.2f}, payment status {status.replace('_', ' ')}."
+        if refund_amount:
+            text += f" Refunded so far: ₹{refund_amount:,.2f}."
+        return text
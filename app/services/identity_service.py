@@ -0,0 +1,155 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+
+
+DEFAULT_USER_EMAIL = "demo@example.com"
+DEFAULT_USER_NAME = "Demo User"
+
+
+class UserNotFoundError(ValueError):
+    """A supplied user_id doesn't exist"""
+
+
+class IdentityCache:
+    """
+    Process-wide TTL cache of resolved user ids.
+    
+    Keys are "id:<uuid>", "email:<address>" and "default". Only users that
+    exist are cached; users are never deleted, so an entry can't go stale
+    within its TTL. Bounded by entry count, least recently used goes first.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: str, user_id: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, user_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+identity_cache = IdentityCache(
+    max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.IDENTITY_CACHE_TTL_SECONDS
+)
+
+
+class IdentityResolver:
+    """Resolves the user a request acts for, mostly without touching the database"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def resolve(self, user_id: Optional[str] = None) -> str:
+        """
+        Validate a supplied user id, or fall back to the default user.
+        
+        Args:
+            user_id: User ID from the request, or None
+        
+        Returns:
+            The user id as a string
+        
+        Raises:
+            UserNotFoundError: If user_id doesn't exist
+        """
+        if not user_id:
+            return await self.default_user_id()
+        if not await self.user_exists(user_id):
+            raise UserNotFoundError(f"User {user_id} not found")
+        return str(uuid.UUID(user_id))
+    
+    async def user_exists(self, user_id: str) -> bool:
+        try:
+            user_id = str(uuid.UUID(user_id))
+        except ValueError:
+            return False
+        
+        if identity_cache.get(f"id:{user_id}"):
+            return True
+        
+        result = await self.db.execute(select(User.id).where(User.id == user_id))
+        if result.scalar_one_or_none() is None:
+            return False
+        identity_cache.set(f"id:{user_id}", user_id)
+        return True
+    
+    async def user_id_for_email(self, email: str) -> Optional[str]:
+        cached = identity_cache.get(f"email:{email}")
+        if cached:
+            return cached
+        
+        result = await self.db.execute(select(User.id).where(User.email == email))
+        found = result.scalar_one_or_none()
+        if found is None:
+            return None
+        return self._remember(str(found), email)
+    
+    async def default_user_id(self, create: bool = True) -> Optional[str]:
+        """
+        The user requests without a user_id act for.
+        
+        That is the first existing user, as before; with none, the demo user
+        is created. INSERT ... ON CONFLICT makes concurrent first requests
+        agree on one row instead of failing on the unique email.
+        
+        Args:
+            create: Create the demo user if there are no users
+        """
+        cached = identity_cache.get("default")
+        if cached:
+            return cached
+        
+        result = await self.db.execute(select(User.id).limit(1))
+        found = result.scalar_one_or_none()
+        
+        if found is None:
+            if not create:
+                return None
+            stmt = (
+                insert(User)
+                .values(id=uuid.uuid4(), email=DEFAULT_USER_EMAIL, name=DEFAULT_USER_NAME)
+                .on_conflict_do_nothing(index_elements=[User.email])
+            )
+            await self.db.execute(stmt)
+            await self.db.commit()
+            found = await self.user_id_for_email(DEFAULT_USER_EMAIL)
+        
+        user_id = str(found)
+        identity_cache.set("default", user_id)
+        return self._remember(user_id)
+    
+    @staticmethod
+    def _remember(user_id: str, email: Optional[str] = None) -> str:
+        identity_cache.set(f"id:{user_id}", user_id)
+        if email:
+            identity_cache.set(f"email:{email}", user_id)
+        return user_id
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from typing import List, Optional
+from sqlalchemy import select, delete, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.schemas.common import ConversationStatus
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationPurger:
+    """
+    Removes soft-deleted conversations and their messages.
+    
+    Works in bounded batches with set-based deletes, committing after each
+    one, so no single statement or transaction grows with the size of a
+    conversation. Deleted conversations are never written again, so an
+    interrupted purge simply continues on the next run.
+    """
+    
+    def __init__(
+        self,
+        conversation_batch_size: Optional[int] = None,
+        message_batch_size: Optional[int] = None
+    ):
+        self.conversation_batch_size = conversation_batch_size or settings.PURGE_CONVERSATION_BATCH_SIZE
+        self.message_batch_size = message_batch_size or settings.PURGE_MESSAGE_BATCH_SIZE
+    
+    async def purge(self) -> int:
+        """
+        Purge every conversation currently marked deleted.
+        
+        Returns:
+            Number of conversations removed
+        """
+        purged = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                stmt = (
+                    select(Conversation.id)
+                    .where(Conversation.status == ConversationStatus.DELETED)
+                    .limit(self.conversation_batch_size)
+                )
+                conversation_ids = list((await db.execute(stmt)).scalars().all())
+                if not conversation_ids:
+                    return purged
+                
+                await self._delete_messages(db, conversation_ids)
+                await db.execute(
+                    delete(Conversation).where(Conversation.id == any_(self._ids_param(conversation_ids)))
+                )
+                await db.commit()
+                purged += len(conversation_ids)
+    
+    async def _delete_messages(self, db: AsyncSession, conversation_ids: List) -> None:
+        """Delete the conversations' messages, message_batch_size rows per transaction"""
+        batch = (
+            select(Message.id)
+            .where(Message.conversation_id == any_(self._ids_param(conversation_ids)))
+            .limit(self.message_batch_size)
+            .scalar_subquery()
+        )
+        stmt = delete(Message).where(Message.id.in_(batch))
+        
+        while True:
+            result = await db.execute(stmt)
+            await db.commit()
+            if result.rowcount < self.message_batch_size:
+                return
+    
+    @staticmethod
+    def _ids_param(conversation_ids: List):
+        return bindparam("conversation_ids", conversation_ids, type_=ARRAY(UUID(as_uuid=True)))
+
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _run_purger() -> None:
+    purger = ConversationPurger()
+    while True:
+        try:
+            purged = await purger.purge()
+            if purged:
+                logger.info(f"Purged {purged} deleted conversations")
+        except Exception as e:
+            logger.warning(f"Conversation purge failed: {str(e)}")
+        await asyncio.sleep(settings.PURGE_INTERVAL_SECONDS)
+
+
+def start_purger() -> None:
+    """Start the background purge loop (call once, from the startup event)"""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run_purger())
+
+
+async def stop_purger() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
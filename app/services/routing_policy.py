@@ -0,0 +1,82 @@
+import re
+from typing import Dict, Any, Optional, Set
+
+from app.core.config import settings
+from app.agents.intent_classifier import get_intent_classifier
+
+
+_WORD = re.compile(r"[a-z]+")
+
+# Words that clearly belong to one agent's domain
+AGENT_KEYWORDS: Dict[str, Set[str]] = {
+    "order": {"order", "orders", "track", "tracking", "delivery", "deliver", "delivered",
+              "shipped", "shipping", "package", "parcel", "arrive", "courier", "cancel"},
+    "billing": {"refund", "refunds", "refunded", "invoice", "payment", "paid", "pay",
+                "charge", "charged", "bill", "billing", "price", "pricing", "subscription"},
+    "support": {"password", "account", "login", "email", "policy", "faq", "reset",
+                "profile", "signup", "register"}
+}
+
+AGENT_IDENTIFIERS = {
+    "order": re.compile(r"\b(ORD-\d{4}-\d{3,}|TRK\d{6,})\b", re.IGNORECASE),
+    "billing": re.compile(r"\bINV-\d{4}-\d{3,}\b", re.IGNORECASE)
+}
+
+
+class StickyRoutingPolicy:
+    """
+    Decides whether a follow-up can skip the router.
+    
+    The last routing decision of a conversation (Conversation.extra_data
+    ["routing"]) is reused when it was confident, hasn't been reused too
+    many times in a row, and the new message shows no sign of a topic
+    shift.
+    """
+    
+    def should_reuse(self, message: str, last_routing: Optional[Dict[str, Any]]) -> bool:
+        """
+        Args:
+            message: User's message
+            last_routing: {"agent", "confidence", "sticky_turns"} or None
+        
+        Returns:
+            True if last_routing["agent"] should handle message
+        """
+        if not settings.STICKY_ROUTING_ENABLED or not last_routing:
+            return False
+        try:
+            confidence = float(last_routing.get("confidence"))
+        except (TypeError, ValueError):
+            # Missing or malformed, e.g. stored before confidences were checked
+            return False
+        if not confidence >= settings.STICKY_ROUTING_MIN_CONFIDENCE:  # NaN too
+            return False
+        if last_routing.get("sticky_turns", 0) >= settings.STICKY_ROUTING_MAX_TURNS:
+            return False
+        return not self.is_topic_shift(message, last_routing["agent"])
+    
+    def is_topic_shift(self, message: str, agent: str) -> bool:
+        """
+        Cheap check whether message moves away from agent's domain.
+        
+        A shift is signalled by another domain's identifiers or keywords
+        without any of agent's own, or by a confident classifier prediction
+        for another agent.
+        """
+        words = set(_WORD.findall(message.lower()))
+        mentioned = {
+            name for name, keywords in AGENT_KEYWORDS.items() if words & keywords
+        }
+        mentioned |= {
+            name for name, pattern in AGENT_IDENTIFIERS.items() if pattern.search(message)
+        }
+        if mentioned and agent not in mentioned:
+            return True
+        
+        classifier = get_intent_classifier()
+        if classifier:
+            predicted, confidence = classifier.predict(message)
+            if predicted != agent and confidence >= settings.ROUTER_CLASSIFIER_THRESHOLD:
+                return True
+        
+        return False
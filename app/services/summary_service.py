@@ -0,0 +1,173 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ai_client import ai_client
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.schemas.common import ConversationStatus
+from app.services.conversation_service import ConversationService
+from app.utils.context_builder import truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+
+SUMMARY_PROMPT = """You maintain a running summary of a customer support conversation.
+
+Update the existing summary with the new messages. Keep:
+- Order numbers, invoice numbers and tracking numbers mentioned
+- What the customer asked for and what was already resolved
+- Promises or next steps the support team gave
+
+Write at most a short paragraph in plain text. Do not include greetings or filler."""
+
+
+class SummaryService:
+    """
+    Service for rolling conversation summaries.
+    
+    Once more messages than the context window (MAX_CONTEXT_MESSAGES) are
+    past a conversation's summary, everything but the SUMMARY_KEEP_RECENT
+    newest is folded into a running summary stored in
+    Conversation.extra_data:
+        
+        {"summary": {"text": ..., "summarized_until": <created_at>, "message_count": N}}
+    
+    Agents get the summary in place of the messages it covers.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.conversation_service = ConversationService(db)
+        self.ai_client = ai_client
+    
+    @staticmethod
+    def get_summary(conversation: Conversation) -> Tuple[Optional[str], Optional[datetime]]:
+        """
+        Read the summary of a conversation.
+        
+        Returns:
+            Tuple of (summary text, created_at of the last summarized message)
+        """
+        summary = (conversation.extra_data or {}).get("summary")
+        if not summary:
+            return None, None
+        return summary["text"], datetime.fromisoformat(summary["summarized_until"])
+    
+    @staticmethod
+    def unsummarized_count(conversation: Conversation) -> int:
+        """Messages of a conversation not folded into its summary yet"""
+        summary = (conversation.extra_data or {}).get("summary") or {}
+        return (conversation.message_count or 0) - summary.get("message_count", 0)
+    
+    async def update_summary(self, conversation_id: str) -> bool:
+        """
+        Fold older messages into the summary once they fall out of the
+        context window.
+        
+        The message count column decides whether anything is due, so most
+        calls cost one narrow query. Only the messages being folded in are
+        loaded, and the transaction is ended before the LLM call.
+        
+        Args:
+            conversation_id: Conversation to summarize
+        
+        Returns:
+            True if the summary was updated
+        """
+        stmt = select(Conversation.message_count, Conversation.extra_data).where(
+            Conversation.id == conversation_id,
+            Conversation.status != ConversationStatus.DELETED
+        )
+        row = (await self.db.execute(stmt)).one_or_none()
+        if not row:
+            return False
+        
+        previous = (row.extra_data or {}).get("summary") or {}
+        unsummarized = row.message_count - previous.get("message_count", 0)
+        if unsummarized <= settings.MAX_CONTEXT_MESSAGES:
+            return False
+        
+        stmt = (
+            select(Message.role, Message.content, Message.created_at)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at)
+            .limit(unsummarized - settings.SUMMARY_KEEP_RECENT)
+        )
+        if previous:
+            stmt = stmt.where(Message.created_at > datetime.fromisoformat(previous["summarized_until"]))
+        
+        to_summarize = (await self.db.execute(stmt)).all()
+        # Don't hold a connection (or the snapshot) during the LLM call
+        await self.db.commit()
+        if not to_summarize:
+            return False
+        
+        transcript = "\n".join(
+            f"{role.value}: {truncate_to_tokens(content, settings.MAX_TOKENS_PER_MESSAGE)}"
+            for role, content, _ in to_summarize
+        )
+        
+        response = await self.ai_client.chat.completions.create(
+            model=settings.ai_model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"Existing summary:\n{previous.get('text') or '(none)'}\n\nNew messages:\n{transcript}"
+                }
+            ],
+            temperature=0.3,
+            max_tokens=settings.SUMMARY_MAX_TOKENS
+        )
+        
+        await self.conversation_service.update_extra_data(conversation_id, {
+            "summary": {
+                "text": response.choices[0].message.content.strip(),
+                "summarized_until": to_summarize[-1].created_at.isoformat(),
+                "message_count": previous.get("message_count", 0) + len(to_summarize)
+            }
+        })
+        await self.db.commit()
+        
+        return True
+
+
+# Summary updates in flight by conversation id (asyncio only keeps weak
+# references to running tasks)
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _run_summary_update(conversation_id: str) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await SummaryService(db).update_summary(conversation_id)
+    except Exception as e:
+        logger.warning(f"Summary update failed for {conversation_id}: {str(e)}")
+    finally:
+        _tasks.pop(conversation_id, None)
+
+
+def schedule_summary_update(conversation_id: str, unsummarized: Optional[int] = None) -> None:
+    """
+    Update a conversation's summary in the background.
+    
+    Runs after the reply has been sent, with its own session. At most one
+    update per conversation runs at a time.
+    
+    Args:
+        conversation_id: Conversation to summarize
+        unsummarized: Messages past the summary if known, nothing is
+            scheduled while they fit the context window
+    """
+    if not settings.SUMMARY_ENABLED or conversation_id in _tasks:
+        return
+    if unsummarized is not None and unsummarized <= settings.MAX_CONTEXT_MESSAGES:
+        return
+    
+    _tasks[conversation_id] = asyncio.create_task(_run_summary_update(conversation_id))
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.tools.result_cache import tool_result_cache
 
 
 class ToolResult(BaseModel):
@@ -11,7 +15,23 @@ class ToolResult(BaseModel):
 
 
 class BaseTool(ABC):
-    """Abstract base class for all agent tools"""
+    """
+    Abstract base class for all agent tools.
+    
+    Tool instances are shared process-wide (see AgentRegistry) and built
+    without a session; every call runs on a copy bound to its own session
+    via with_session(), except for tools that read through the loaders.
+    """
+    
+    # Tools that only select can run on the read replica
+    read_only: bool = False
+    
+    # Read-only tools whose results may be reused for TOOL_CACHE_TTL_SECONDS
+    cacheable: bool = False
+    
+    # Read-only tools that only read through the request's DataLoaders,
+    # which batch lookups into sessions of their own; such tools run unbound
+    uses_loaders: bool = False
     
     @property
     @abstractmethod
@@ -30,6 +50,44 @@ class BaseTool(ABC):
         """Execute tool functionality"""
         pass
     
+    async def run(self, **kwargs) -> ToolResult:
+        """
+        Execute through the tool result cache.
+        
+        String arguments are stripped so equivalent calls share an entry.
+        Only successful results of cacheable tools are stored, tagged with
+        consistency_key() so mutating tools can invalidate them.
+        """
+        arguments = {
+            key: value.strip() if isinstance(value, str) else value
+            for key, value in kwargs.items()
+        }
+        use_cache = self.cacheable and settings.TOOL_CACHE_ENABLED
+        
+        if use_cache:
+            cached = tool_result_cache.get(self.name, arguments)
+            if cached is not None:
+                return cached
+        
+        result = await self.execute(**arguments)
+        
+        if use_cache and result.success:
+            tool_result_cache.set(
+                self.name, arguments, result, tag=self.consistency_key(**arguments)
+            )
+        return result
+    
+    def with_session(self, db: AsyncSession) -> "BaseTool":
+        """Return a copy of this tool bound to another database session"""
+        return self.__class__(db)
+    
+    def consistency_key(self, **kwargs) -> Optional[str]:
+        """Record a call touches, for read-your-writes routing (None if none)"""
+        for argument in ("order_number", "invoice_number"):
+            if kwargs.get(argument):
+                return f"{argument}:{str(kwargs[argument]).strip()}"
+        return None
+    
     def to_openai_tool(self) -> Dict[str, Any]:
         """Convert to OpenAI function format"""
         return {
@@ -1,15 +1,18 @@
-from typing import Dict, Any
-from sqlalchemy import select
+from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.tools.base_tool import BaseTool, ToolResult
-from app.models.payment import Payment
+from app.tools.loaders import get_loaders
 
 
 class GetInvoiceDetailsTool(BaseTool):
     """Gets invoice details"""
     
-    def __init__(self, db: AsyncSession):
+    read_only = True
+    cacheable = True
+    uses_loaders = True
+    
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
@@ -31,9 +34,7 @@ class GetInvoiceDetailsTool(BaseTool):
     
     async def execute(self, invoice_number: str) -> ToolResult:
         try:
-            stmt = select(Payment).where(Payment.invoice_number == invoice_number)
-            result = await self.db.execute(stmt)
-            payment = result.scalar_one_or_none()
+            payment = await get_loaders().payments.load(invoice_number)
             
             if not payment:
                 return ToolResult(success=False, error="Invoice not found")
@@ -51,7 +52,9 @@ class GetInvoiceDetailsTool(BaseTool):
 class CheckRefundStatusTool(BaseTool):
     """Checks refund status"""
     
-    def __init__(self, db: AsyncSession):
+    read_only = True
+    
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
@@ -78,7 +81,7 @@ class CheckRefundStatusTool(BaseTool):
 class ProcessRefundTool(BaseTool):
     """Processes refund"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
@@ -0,0 +1,126 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional
+from sqlalchemy import select
+
+from app.core.database import read_session, recently_written
+from app.models.order import Order
+from app.models.payment import Payment
+
+
+class DataLoader:
+    """
+    Batches and memoizes lookups by key.
+    
+    Keys requested by concurrent callers before the loader dispatches are
+    fetched with a single call to batch_fn. Results (including "not found",
+    as None) are memoized for the loader's lifetime, so a loader should live
+    no longer than one request.
+    """
+    
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]):
+        self.batch_fn = batch_fn
+        self._results: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self.batches = 0
+    
+    async def load(self, key: Hashable) -> Any:
+        """Value for key, or None if it doesn't exist"""
+        future = self._results.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._results[key] = future
+            self._queue.append(key)
+            if self._dispatch_task is None:
+                self._dispatch_task = asyncio.create_task(self._dispatch())
+        # Shielded: one caller being cancelled mustn't fail the others
+        return await asyncio.shield(future)
+    
+    def clear(self, key: Optional[Hashable] = None) -> None:
+        """Forget a memoized key, or all of them"""
+        if key is None:
+            self._results = {k: f for k, f in self._results.items() if not f.done()}
+        elif key in self._results and self._results[key].done():
+            del self._results[key]
+    
+    async def _dispatch(self) -> None:
+        # Give callers started in the same tick a chance to queue their keys
+        await asyncio.sleep(0)
+        keys, self._queue = self._queue, []
+        self._dispatch_task = None
+        self.batches += 1
+        
+        try:
+            values = await self.batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                # Failures are not memoized, the next load retries
+                future = self._results.pop(key)
+                future.set_exception(e)
+                # Retrieved here in case every caller was cancelled
+                future.exception()
+            return
+        
+        for key in keys:
+            self._results[key].set_result(values.get(key))
+
+
+async def _load_orders(order_numbers: List[str]) -> Dict[str, Order]:
+    """Orders by order number, in one IN (...) query"""
+    async with read_session(_written_key("order_number", order_numbers)) as db:
+        stmt = select(Order).where(Order.order_number.in_(order_numbers))
+        result = await db.execute(stmt)
+        return {order.order_number: order for order in result.scalars().all()}
+
+
+async def _load_payments(invoice_numbers: List[str]) -> Dict[str, Payment]:
+    """Payments by invoice number, in one IN (...) query"""
+    async with read_session(_written_key("invoice_number", invoice_numbers)) as db:
+        stmt = select(Payment).where(Payment.invoice_number.in_(invoice_numbers))
+        result = await db.execute(stmt)
+        return {payment.invoice_number: payment for payment in result.scalars().all()}
+
+
+def _written_key(argument: str, values: List[str]) -> Optional[str]:
+    """A recently written key of the batch (reads it from the primary), if any"""
+    keys = (f"{argument}:{value}" for value in values)
+    return next((key for key in keys if recently_written(key)), None)
+
+
+class Loaders:
+    """The DataLoaders of one request"""
+    
+    def __init__(self):
+        self.orders = DataLoader(_load_orders)
+        self.payments = DataLoader(_load_payments)
+    
+    def clear(self) -> None:
+        self.orders.clear()
+        self.payments.clear()
+
+
+_loaders: ContextVar[Optional[Loaders]] = ContextVar("loaders", default=None)
+
+
+@contextmanager
+def loader_scope() -> Iterator[Loaders]:
+    """
+    Share one set of loaders with everything running in this block,
+    including tasks it starts (they inherit the context).
+    """
+    token = _loaders.set(Loaders())
+    try:
+        yield _loaders.get()
+    finally:
+        try:
+            _loaders.reset(token)
+        except ValueError:
+            # Abandoned streaming response, finalized from another context
+            pass
+
+
+def get_loaders() -> Loaders:
+    """The current request's loaders; fresh ones outside a loader_scope()"""
+    return _loaders.get() or Loaders()
@@ -1,15 +1,18 @@
-from typing import Dict, Any
-from sqlalchemy import select
+from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.tools.base_tool import BaseTool, ToolResult
-from app.models.order import Order
+from app.tools.loaders import get_loaders
 
 
 class FetchOrderDetailsTool(BaseTool):
     """Fetches complete order details"""
     
-    def __init__(self, db: AsyncSession):
+    read_only = True
+    cacheable = True
+    uses_loaders = True
+    
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
@@ -31,9 +34,7 @@ class FetchOrderDetailsTool(BaseTool):
     
     async def execute(self, order_number: str) -> ToolResult:
         try:
-            stmt = select(Order).where(Order.order_number == order_number)
-            result = await self.db.execute(stmt)
-            order = result.scalar_one_or_none()
+            order = await get_loaders().orders.load(order_number)
             
             if not order:
                 return ToolResult(success=False, error=f"Order {order_number} not found")
@@ -52,7 +53,11 @@ class FetchOrderDetailsTool(BaseTool):
 class CheckDeliveryStatusTool(BaseTool):
     """Checks delivery status"""
     
-    def __init__(self, db: AsyncSession):
+    read_only = True
+    cacheable = True
+    uses_loaders = True
+    
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
@@ -74,16 +79,18 @@ class CheckDeliveryStatusTool(BaseTool):
     
     async def execute(self, order_number: str) -> ToolResult:
         try:
-            stmt = select(Order).where(Order.order_number == order_number)
-            result = await self.db.execute(stmt)
-            order = result.scalar_one_or_none()
+            order = await get_loaders().orders.load(order_number)
             
             if not order:
                 return ToolResult(success=False, error="Order not found")
             
             return ToolResult(success=True, data={
                 "status": order.status.value,
-                "tracking_number": order.tracking_number
+                "tracking_number": order.tracking_number,
+                "estimated_delivery": (
+                    order.estimated_delivery.date().isoformat()
+                    if order.estimated_delivery else None
+                )
             })
         except Exception as e:
             return ToolResult(success=False, error=str(e))
@@ -92,7 +99,7 @@ class CheckDeliveryStatusTool(BaseTool):
 class ModifyOrderTool(BaseTool):
     """Modifies order"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
@@ -120,7 +127,7 @@ class ModifyOrderTool(BaseTool):
 class CancelOrderTool(BaseTool):
     """Cancels order"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
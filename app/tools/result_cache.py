@@ -0,0 +1,92 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class ToolResultCache:
+    """
+    Process-wide cache of successful read-only tool results.
+    
+    Keyed by tool name and normalized arguments, bounded by entry count
+    (least recently used goes first) and a short TTL. Every entry carries
+    the tag of the record it describes (BaseTool.consistency_key(), e.g.
+    "order_number:ORD-2024-002"), so a mutating tool can drop all cached
+    results for the record it changed.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str], Any]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True, default=str)}"
+    
+    def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Any]:
+        """Return the cached result, or None on a miss or expired entry"""
+        key = self.make_key(tool_name, arguments)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+    
+    def set(self, tool_name: str, arguments: Dict[str, Any], result: Any, tag: Optional[str] = None) -> None:
+        key = self.make_key(tool_name, arguments)
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, tag, result)
+        if tag:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+    
+    def invalidate(self, tag: str) -> None:
+        """Drop every cached result tagged with tag"""
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        self.invalidations += len(keys)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry[1]:
+            keys = self._tags.get(entry[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[entry[1]]
+
+
+tool_result_cache = ToolResultCache(
+    max_entries=settings.TOOL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TOOL_CACHE_TTL_SECONDS
+)
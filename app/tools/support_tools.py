@@ -1,10 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.tools.base_tool import BaseTool, ToolResult
 
 
 class QueryConversationHistoryTool(BaseTool):
-    def __init__(self, db: AsyncSession):
+    read_only = True
+    
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
@@ -30,7 +32,9 @@ class QueryConversationHistoryTool(BaseTool):
 
 
 class SearchFAQTool(BaseTool):
-    def __init__(self, db: AsyncSession):
+    read_only = True
+    
+    def __init__(self, db: Optional[AsyncSession] = None):
         self.db = db
     
     @property
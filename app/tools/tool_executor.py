@@ -0,0 +1,134 @@
+import asyncio
+import json
+from typing import List, Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.tools.base_tool import BaseTool
+from app.tools.loaders import get_loaders
+from app.tools.result_cache import tool_result_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, read_session, mark_written
+
+
+class ToolExecutor:
+    """
+    Runs the tool calls of one assistant turn concurrently.
+    
+    A request's AsyncSession cannot be shared between concurrent tasks, so
+    every tool call gets its own short-lived session: a read replica session
+    for read-only tools, unless the record they look up was just written.
+    Tools that read through the loaders get none, the loaders have theirs.
+    Parallelism is bounded by a semaphore and every call has a timeout.
+    """
+    
+    def __init__(
+        self,
+        tools: List[BaseTool],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        session_factory=AsyncSessionLocal,
+        read_session_factory=read_session
+    ):
+        self.tools = {tool.name: tool for tool in tools}
+        self.timeout = timeout or settings.TOOL_TIMEOUT_SECONDS
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self._semaphore = asyncio.Semaphore(
+            max_concurrency or settings.TOOL_MAX_CONCURRENCY
+        )
+    
+    async def execute_all(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Execute tool calls concurrently.
+        
+        Args:
+            tool_calls: Tool calls in OpenAI message format
+        
+        Returns:
+            Tool result messages, in the same order as tool_calls
+        """
+        return list(await asyncio.gather(
+            *(self.execute(tool_call) for tool_call in tool_calls)
+        ))
+    
+    async def execute(self, tool_call: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Execute a single tool call in its own session (if it needs one).
+        
+        Args:
+            tool_call: Tool call in OpenAI message format
+        
+        Returns:
+            Tool result message to append to the conversation
+        """
+        function_name = tool_call["function"]["name"]
+        
+        # Find the tool
+        tool = self.tools.get(function_name)
+        
+        if not tool:
+            return self._tool_message(tool_call, f"Error: Tool {function_name} not found")
+        
+        # Parse arguments
+        try:
+            arguments = json.loads(tool_call["function"]["arguments"])
+        except json.JSONDecodeError:
+            return self._tool_message(tool_call, "Error: Invalid tool arguments")
+        
+        key = tool.consistency_key(**arguments) if isinstance(arguments, dict) else None
+        
+        # Execute tool
+        async with self._semaphore:
+            if tool.uses_loaders:
+                # The loaders open (and batch) their own read sessions
+                return await self._run(tool_call, tool, arguments)
+            
+            if tool.read_only:
+                session = self.read_session_factory(key)
+            else:
+                session = self.session_factory()
+            
+            async with session:
+                return await self._run(tool_call, tool, arguments, session, key)
+    
+    async def _run(
+        self,
+        tool_call: Dict[str, Any],
+        tool: BaseTool,
+        arguments: Dict[str, Any],
+        session: Optional[AsyncSession] = None,
+        key: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Run a tool with a timeout, on session if given, and end its transaction"""
+        try:
+            bound = tool.with_session(session) if session is not None else tool
+            result = await asyncio.wait_for(bound.run(**arguments), timeout=self.timeout)
+            if session is not None:
+                await session.commit()
+            if key and not tool.read_only:
+                mark_written(key)
+                # Lookups after this must see the change
+                tool_result_cache.invalidate(key)
+                get_loaders().clear()
+        except asyncio.TimeoutError:
+            if session is not None:
+                await session.rollback()
+            return self._tool_message(
+                tool_call,
+                f"Error: Tool {tool.name} timed out after {self.timeout}s"
+            )
+        except Exception as e:
+            if session is not None:
+                await session.rollback()
+            return self._tool_message(tool_call, f"Error: {str(e)}")
+        
+        return self._tool_message(tool_call, json.dumps(result.dict()))
+    
+    @staticmethod
+    def _tool_message(tool_call: Dict[str, Any], content: str) -> Dict[str, str]:
+        """Build a tool result message"""
+        return {
+            "tool_call_id": tool_call["id"],
+            "role": "tool",
+            "content": content
+        }
@@ -0,0 +1,150 @@
+import re
+from typing import List, Dict, Optional
+from pydantic import BaseModel
+
+
+# Approximation of a BPE tokenizer: short words and punctuation are one
+# token, longer words cost roughly one extra token per 4 characters
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+SHORT_WORD_CHARS = 6
+CHARS_PER_TOKEN = 4
+
+# Role/formatting tokens the chat format adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATION_MARKER = " …[truncated]"
+
+
+class ContextWindow(BaseModel):
+    """History packed into a token budget"""
+    messages: List[Dict[str, str]]
+    tokens_used: int = 0
+    dropped: int = 0
+    truncated: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        """Summary for response metadata"""
+        return {
+            "messages": len(self.messages),
+            "tokens": self.tokens_used,
+            "dropped": self.dropped,
+            "truncated": self.truncated
+        }
+
+
+def _piece_tokens(piece: str) -> int:
+    return 1 + max(0, len(piece) - SHORT_WORD_CHARS) // CHARS_PER_TOKEN
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Approximate the number of tokens in text without a tokenizer.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    return sum(_piece_tokens(piece) for piece in _TOKEN_PIECE.findall(text))
+
+
+def count_message_tokens(message: Dict[str, str]) -> int:
+    """Approximate tokens of one chat message including formatting overhead"""
+    return count_tokens(message.get("content")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text so it fits in max_tokens, keeping the beginning.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+
+    Returns:
+        The text unchanged if it fits, otherwise its head plus a marker
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    limit = max(0, max_tokens - count_tokens(TRUNCATION_MARKER))
+    used = 0
+    end = 0
+    for match in _TOKEN_PIECE.finditer(text):
+        tokens = _piece_tokens(match.group())
+        if used + tokens > limit:
+            # A piece that could never fit (a URL, base64, a long run of
+            # one character) is cut to the space left instead of dropped
+            remaining = limit - used
+            if tokens > limit and remaining > 0:
+                end = match.start() + SHORT_WORD_CHARS + (remaining - 1) * CHARS_PER_TOKEN
+            break
+        used += tokens
+        end = match.end()
+
+    return text[:end].rstrip() + TRUNCATION_MARKER
+
+
+def build_context(
+    history: List[Dict[str, str]],
+    max_tokens: int,
+    max_messages: Optional[int] = None,
+    max_message_tokens: Optional[int] = None
+) -> ContextWindow:
+    """
+    Pack the most recent messages of history into a token budget.
+
+    Messages are taken newest first until the budget or max_messages is hit.
+    Oversized messages are truncated to max_message_tokens first, and the
+    oldest message that still gets in may be truncated to the space left.
+
+    Args:
+        history: Conversation history, oldest first
+        max_tokens: Token budget for the packed history
+        max_messages: Maximum number of messages to keep
+        max_message_tokens: Per-message token limit
+
+    Returns:
+        ContextWindow with the packed messages, oldest first
+    """
+    packed: List[Dict[str, str]] = []
+    used = 0
+    truncated = 0
+
+    for message in reversed(history):
+        if max_messages is not None and len(packed) >= max_messages:
+            break
+
+        content = message.get("content") or ""
+        was_truncated = False
+        if max_message_tokens and count_tokens(content) > max_message_tokens:
+            content = truncate_to_tokens(content, max_message_tokens)
+            was_truncated = True
+
+        cost = count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > max_tokens:
+            # Fit a shortened version of this message if that leaves room
+            # for more than the marker, then stop
+            remaining = max_tokens - used - MESSAGE_OVERHEAD_TOKENS
+            if remaining > count_tokens(TRUNCATION_MARKER):
+                content = truncate_to_tokens(content, remaining)
+                truncated += 1
+                packed.append({**message, "content": content})
+                used += count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            break
+
+        packed.append({**message, "content": content})
+        used += cost
+        if was_truncated:
+            truncated += 1
+
+    packed.reverse()
+    return ContextWindow(
+        messages=packed,
+        tokens_used=used,
+        dropped=len(history) - len(packed),
+        truncated=truncated
+    )
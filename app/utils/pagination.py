@@ -0,0 +1,26 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(updated_at: datetime, id: uuid.UUID) -> str:
+    """Opaque keyset cursor pointing just past (updated_at, id)"""
+    payload = json.dumps({"updated_at": updated_at.isoformat(), "id": str(id)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor made by encode_cursor().
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["updated_at"]), uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,111 @@
+import re
+import zlib
+from typing import FrozenSet, List
+
+import numpy as np
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Words that carry no intent; dropping them lets paraphrases line up
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did",
+    "i", "me", "my", "you", "your", "we", "our", "it", "its", "this", "that",
+    "to", "of", "in", "on", "for", "and", "or", "with", "can", "could",
+    "would", "please", "hi", "hello", "hey", "thanks", "thank"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized words of text, without stopwords"""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def _features(words: List[str]) -> List[str]:
+    """Word unigrams, bigrams and character trigrams"""
+    features = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def hash_embed(text: str, dim: int = 1024) -> np.ndarray:
+    """
+    Embed text as an L2-normalized hashed feature vector.
+    
+    Uses the signed hashing trick over words, word bigrams and character
+    trigrams. crc32 keeps the hash stable across processes, so vectors can
+    be persisted.
+    
+    Args:
+        text: Text to embed
+        dim: Vector size
+    
+    Returns:
+        float32 vector of length dim (all zeros for empty text)
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(tokenize(text)):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+# Words that frame a question rather than say what it is about, so "how do
+# returns work" and "return policy?" reduce to the same terms
+FRAMING_WORDS = STOPWORDS | frozenset({
+    "how", "what", "when", "where", "which", "who", "why", "will", "should",
+    "work", "process", "policy", "procedure", "rule", "explain", "tell",
+    "know", "question", "about", "some", "any", "there", "get", "want", "find",
+    "need", "like", "possible", "able", "way", "have", "has", "am", "im"
+})
+
+# Words that flip the meaning of a question
+_NEGATION = re.compile(
+    r"\b(not|no|never|nothing|without|cannot|cant|dont|doesnt|didnt|wont|isnt|"
+    r"arent|wasnt|havent|hasnt|shouldnt|wouldnt|couldnt)\b"
+)
+
+_SUFFIXES = (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", ""))
+
+
+def _plain(text: str) -> str:
+    """Lowercase without apostrophes ("don't" reads as dont)"""
+    return text.lower().replace("'", "").replace("\u2019", "")
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping, enough to line up plurals and verb forms"""
+    if word.endswith("ss"):
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            # shipping -> shipp -> ship
+            if suffix in ("ing", "ed") and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            return word
+    return word
+
+
+def question_terms(text: str) -> List[str]:
+    """Stemmed words that say what a question is about, in order"""
+    return [
+        stem(word) for word in _WORD.findall(_plain(text))
+        if word not in FRAMING_WORDS and not _NEGATION.fullmatch(word)
+    ]
+
+
+def key_terms(text: str) -> FrozenSet[str]:
+    return frozenset(question_terms(text))
+
+
+def is_negated(text: str) -> bool:
+    """Whether text contains a negation ("not", "don't", "never", ...)"""
+    return bool(_NEGATION.search(_plain(text)))
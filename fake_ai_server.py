@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+
+class Faults(BaseModel):
+    """Behaviour of the fake server, changeable at runtime via PUT /faults"""
+    latency: float = 0.2
+    jitter: float = 0.1
+    error_rate: float = 0.0
+    error_status: int = 500
+    retry_after: Optional[float] = None
+
+
+app = FastAPI(title="Fake OpenAI-compatible server")
+app.state.faults = Faults()
+app.state.model = "fake-model"
+
+
+def _reply(messages: List[Dict[str, Any]]) -> str:
+    """Canned answer: a routing decision for the router, an echo otherwise"""
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    if '"agent"' in system:
+        return json.dumps({"agent": "support", "confidence": 0.5, "reasoning": "Fake server"})
+    user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    return f"[fake] {user}"
+
+
+def _usage(messages: List[Dict[str, Any]], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(len(str(m.get("content") or "").split()) for m in messages)
+    completion_tokens = len(content.split())
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+def _error(faults: Faults) -> JSONResponse:
+    headers = {}
+    if faults.error_status == 429 and faults.retry_after is not None:
+        headers["Retry-After"] = str(faults.retry_after)
+    return JSONResponse(
+        status_code=faults.error_status,
+        content={"error": {"message": "Injected fault", "type": "fake_error"}},
+        headers=headers
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    faults: Faults = app.state.faults
+
+    await asyncio.sleep(max(0.0, faults.latency + random.uniform(-faults.jitter, faults.jitter)))
+    if random.random() < faults.error_rate:
+        return _error(faults)
+
+    messages = body.get("messages", [])
+    content = _reply(messages)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model") or app.state.model
+
+    if not body.get("stream"):
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": _usage(messages, content)
+        }
+
+    include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+    async def events():
+        def chunk(choices, usage=None):
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": choices
+            }
+            if usage:
+                data["usage"] = usage
+            return f"data: {json.dumps(data)}\n\n"
+
+        for word in content.split(" "):
+            yield chunk([{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}])
+            await asyncio.sleep(0.01)
+        yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if include_usage:
+            yield chunk([], _usage(messages, content))
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": app.state.model, "object": "model", "owned_by": "fake"}]}
+
+
+@app.get("/faults")
+async def get_faults() -> Faults:
+    return app.state.faults
+
+
+@app.put("/faults")
+async def set_faults(faults: Faults) -> Faults:
+    """Change latency or error injection without restarting"""
+    app.state.faults = faults
+    return faults
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fake OpenAI-compatible server for testing provider failover. "
+                    "Point LOCAL_AI_BASE_URL at http://127.0.0.1:<port>/v1"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--model", default="fake-model")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of failed requests")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After for 429s")
+    args = parser.parse_args()
+
+    app.state.model = args.model
+    app.state.faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after
+    )
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
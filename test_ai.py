@@ -1,12 +1,12 @@
 import asyncio
-from app.core.ai_client import ai_client
+from app.core.ai_client import ai_client, provider_pool
 from app.core.config import settings
 
 async def main():
     print("🤖 Testing AI connection...\n")
     print(f"Provider: {settings.AI_PROVIDER}")
     print(f"Model: {settings.ai_model}")
-    print(f"Base URL: {settings.ai_base_url}\n")
+    print(f"Providers: {', '.join(provider.name for provider in provider_pool.providers)}\n")
     
     try:
         # Simple test message
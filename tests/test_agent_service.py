@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.agent_service as agent_service
+import app.services.routing_policy as routing_policy
+from app.core.config import settings
+from app.services.agent_service import AgentService, SpeculationStats
+
+
+class FakeClassifier:
+    def __init__(self, agent_type, confidence):
+        self.prediction = (agent_type, confidence)
+    
+    def predict(self, message):
+        return self.prediction
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_ROUTING_ENABLED", True)
+    return AgentService()
+
+
+def use_classifier(monkeypatch, classifier):
+    for module in (agent_service, routing_policy):
+        monkeypatch.setattr(module, "get_intent_classifier", lambda: classifier)
+
+
+def test_speculates_previous_agent_for_follow_up(service, monkeypatch):
+    use_classifier(monkeypatch, FakeClassifier("support", 0.4))
+    
+    prior = service._speculation_prior("and when will it arrive?", {"agent": "order", "confidence": 0.6})
+    
+    assert prior == "order"
+
+
+def test_topic_shift_speculates_classifier_guess(service, monkeypatch):
+    use_classifier(monkeypatch, FakeClassifier("billing", 0.6))
+    
+    prior = service._speculation_prior("I need a refund for INV-2024-001", {"agent": "order", "confidence": 0.6})
+    
+    assert prior == "billing"
+
+
+def test_topic_shift_without_classifier_skips_speculation(service, monkeypatch):
+    use_classifier(monkeypatch, None)
+    
+    prior = service._speculation_prior("I need a refund for INV-2024-001", {"agent": "order", "confidence": 0.6})
+    
+    assert prior is None
+
+
+class StubAgent:
+    """Charges 100 tokens, then waits for the tool gate like a tool call would"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+        self.cancelled = False
+    
+    async def process(self, message, conversation_history=None, budget=None, summary=None, tool_gate=None):
+        self.calls.append({"budget": budget, "tool_gate": tool_gate})
+        if budget:
+            budget.add(SimpleNamespace(prompt_tokens=80, completion_tokens=20))
+        try:
+            if tool_gate:
+                await tool_gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"content": f"{self.name} answer", "agent": self.name}
+
+
+class StubRouter:
+    def __init__(self, agent=None, error=None):
+        self.agent = agent
+        self.error = error
+    
+    async def route(self, message, conversation_history=None):
+        # Let the speculative agent start first
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return {"agent": self.agent, "confidence": 0.9, "reasoning": "stub"}
+
+
+@pytest.fixture
+def agents(service, monkeypatch):
+    agents = {name: StubAgent(name) for name in ("support", "order", "billing")}
+    service.agents = agents
+    service.registry = SimpleNamespace(get_agent=lambda agent_type: agents[agent_type])
+    monkeypatch.setattr(agent_service, "speculation_stats", SpeculationStats())
+    return agents
+
+
+@pytest.mark.anyio
+async def test_speculation_hit_releases_tools_and_keeps_result(service, agents):
+    service.router = StubRouter("order")
+    
+    response = await service._process_speculative("where is my order?", [], None, "order")
+    
+    [call] = agents["order"].calls
+    assert call["tool_gate"].is_set()
+    assert response["content"] == "order answer"
+    assert response["routing"]["selected_agent"] == "order"
+    assert response["routing"]["speculative"] is True
+    assert agent_service.speculation_stats.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_speculation_miss_cancels_and_runs_chosen_agent(service, agents):
+    service.router = StubRouter("billing")
+    
+    response = await service._process_speculative("I was charged twice", [], None, "order")
+    
+    assert agents["order"].cancelled
+    assert not agents["order"].calls[0]["tool_gate"].is_set()
+    [call] = agents["billing"].calls
+    assert call["tool_gate"] is None
+    assert response["content"] == "billing answer"
+    assert response["routing"]["speculative"] is True
+    stats = agent_service.speculation_stats.stats()
+    assert (stats["misses"], stats["wasted_tokens"]) == (1, 100)
+
+
+@pytest.mark.anyio
+async def test_router_error_cancels_speculative_agent(service, agents):
+    service.router = StubRouter(error=RuntimeError("router down"))
+    
+    with pytest.raises(RuntimeError):
+        await service._process_speculative("where is my order?", [], None, "order")
+    await asyncio.sleep(0)
+    
+    assert agents["order"].cancelled
+    assert agent_service.speculation_stats.stats()["attempts"] == 0
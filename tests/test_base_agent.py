@@ -0,0 +1,163 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.agents.base_agent as base_agent
+from app.agents.base_agent import BaseAgent, TokenBudget
+from app.core.config import settings
+from app.tools.base_tool import BaseTool, ToolResult
+
+
+def chunk(content=None, tool_calls=None):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))],
+        usage=None
+    )
+
+
+def tool_call_chunk(name, arguments):
+    return chunk(tool_calls=[SimpleNamespace(
+        index=0,
+        id="call_1",
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments))
+    )])
+
+
+async def stream(chunks):
+    for item in chunks:
+        yield item
+
+
+class FakeClient:
+    """Streams one scripted round per completion call"""
+    
+    def __init__(self, *rounds):
+        self.rounds = list(rounds)
+        self.chat = SimpleNamespace(completions=self)
+    
+    async def create(self, **kwargs):
+        return stream(self.rounds.pop(0))
+
+
+class LookupTool(BaseTool):
+    def __init__(self, db=None):
+        self.db = db
+    
+    @property
+    def name(self):
+        return "lookup"
+    
+    @property
+    def description(self):
+        return "Look something up"
+    
+    def get_parameters_schema(self):
+        return {"type": "object", "properties": {"id": {"type": "string"}}}
+    
+    async def execute(self, **kwargs):
+        return ToolResult(success=True, data={"status": "shipped"})
+
+
+class FakeExecutor:
+    def __init__(self, tools):
+        pass
+    
+    async def execute(self, tool_call):
+        return {
+            "role": "tool",
+            "tool_call_id": tool_call["id"],
+            "content": json.dumps({"success": True, "data": {"status": "shipped"}})
+        }
+    
+    async def execute_all(self, tool_calls):
+        return [await self.execute(tool_call) for tool_call in tool_calls]
+
+
+class LookupAgent(BaseAgent):
+    name = "lookup"
+    description = "Looks things up"
+    system_prompt = "You look things up."
+    
+    def get_tools(self):
+        return [LookupTool()]
+
+
+@pytest.mark.anyio
+async def test_stream_result_keeps_text_of_tool_rounds(monkeypatch):
+    monkeypatch.setattr(base_agent, "ToolExecutor", FakeExecutor)
+    agent = LookupAgent()
+    agent.ai_client = FakeClient(
+        [chunk("Let me "), chunk("check."), tool_call_chunk("lookup", {"id": "1"})],
+        [chunk("It has "), chunk("shipped.")]
+    )
+    
+    events = [event async for event in agent.process_stream("where is order 1")]
+    
+    streamed = "".join(event["content"] for event in events if event["type"] == "token")
+    result = events[-1]["response"]
+    assert streamed == "Let me check.\n\nIt has shipped."
+    assert result["content"] == streamed
+    assert result["tool_calls"] == [{"tool": "lookup", "arguments": {"id": "1"}}]
+
+
+class ToolHappyClient:
+    """Calls the lookup tool whenever tools are offered, charging usage per call"""
+    
+    def __init__(self, prompt_tokens, completion_tokens):
+        self.usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self.offered_tools = []
+        self.chat = SimpleNamespace(completions=self)
+    
+    async def create(self, **kwargs):
+        self.offered_tools.append(kwargs["tools"] is not None)
+        tool_calls = None
+        if kwargs["tools"]:
+            tool_calls = [SimpleNamespace(
+                id=f"call_{len(self.offered_tools)}",
+                function=SimpleNamespace(name="lookup", arguments=json.dumps({"id": "1"}))
+            )]
+        message = SimpleNamespace(content=None if tool_calls else "It has shipped.", tool_calls=tool_calls)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=self.usage)
+
+
+def test_token_budget_adds_reported_usage():
+    budget = TokenBudget(limit=100)
+    
+    budget.add(SimpleNamespace(prompt_tokens=60, completion_tokens=None))
+    budget.add(None)
+    assert budget.total_tokens == 60
+    assert not budget.exhausted
+    
+    budget.add(SimpleNamespace(prompt_tokens=30, completion_tokens=10))
+    assert budget.to_dict() == {"prompt_tokens": 90, "completion_tokens": 10, "total_tokens": 100}
+    assert budget.exhausted
+
+
+@pytest.mark.anyio
+async def test_tool_rounds_stop_at_max_rounds(monkeypatch):
+    monkeypatch.setattr(base_agent, "ToolExecutor", FakeExecutor)
+    agent = LookupAgent()
+    agent.ai_client = ToolHappyClient(10, 5)
+    
+    result = await agent.process("where is order 1", budget=TokenBudget(limit=10_000))
+    
+    rounds = settings.AGENT_MAX_TOOL_ROUNDS
+    assert agent.ai_client.offered_tools == [True] * rounds + [False]
+    assert len(result["tool_calls"]) == rounds
+    assert result["content"] == "It has shipped."
+    assert result["usage"]["total_tokens"] == 15 * (rounds + 1)
+
+
+@pytest.mark.anyio
+async def test_spent_budget_forces_final_answer_without_tools(monkeypatch):
+    monkeypatch.setattr(base_agent, "ToolExecutor", FakeExecutor)
+    agent = LookupAgent()
+    agent.ai_client = ToolHappyClient(400, 100)
+    
+    result = await agent.process("where is order 1", budget=TokenBudget(limit=1000))
+    
+    # Two calls spend the 1000 tokens, the third gets no tools
+    assert agent.ai_client.offered_tools == [True, True, False]
+    assert result["usage"]["total_tokens"] == 1500
+    assert result["content"] == "It has shipped."
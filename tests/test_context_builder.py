@@ -0,0 +1,88 @@
+from app.utils.context_builder import (
+    MESSAGE_OVERHEAD_TOKENS,
+    TRUNCATION_MARKER,
+    build_context,
+    count_tokens,
+    truncate_to_tokens
+)
+
+
+def message(content, role="user"):
+    return {"role": role, "content": content}
+
+
+def test_count_tokens_charges_long_words_extra():
+    assert count_tokens(None) == 0
+    assert count_tokens("where is my order?") == 5
+    # 1 + (18 - 6) // 4
+    assert count_tokens("x" * 18) == 4
+
+
+def test_text_that_fits_is_unchanged():
+    assert truncate_to_tokens("where is my order?", 5) == "where is my order?"
+
+
+def test_truncation_keeps_the_head_within_the_limit():
+    text = " ".join(f"word{i}" for i in range(100))
+    
+    truncated = truncate_to_tokens(text, 20)
+    
+    assert truncated.startswith("word0 word1")
+    assert truncated.endswith(TRUNCATION_MARKER)
+    assert count_tokens(truncated) <= 20
+
+
+def test_oversized_piece_is_cut_instead_of_dropped():
+    truncated = truncate_to_tokens("x" * 5000, 10)
+    assert truncated.startswith("xxxxxxxx")
+    assert count_tokens(truncated) <= 10
+    
+    truncated = truncate_to_tokens("see https://example.com/" + "a" * 5000, 30)
+    assert "example" in truncated and "aaaa" in truncated
+    assert count_tokens(truncated) <= 30
+
+
+def test_words_that_would_fit_alone_are_not_cut():
+    # "international" is two tokens, only one is left after "word"
+    truncated = truncate_to_tokens("word international " * 10, count_tokens(TRUNCATION_MARKER) + 2)
+    
+    assert truncated == "word" + TRUNCATION_MARKER
+
+
+def test_build_context_keeps_newest_messages_in_budget():
+    history = [message(f"message number {i}") for i in range(10)]
+    per_message = count_tokens("message number 0") + MESSAGE_OVERHEAD_TOKENS
+    
+    window = build_context(history, max_tokens=3 * per_message)
+    
+    assert [m["content"] for m in window.messages] == [f"message number {i}" for i in (7, 8, 9)]
+    assert (window.tokens_used, window.dropped, window.truncated) == (3 * per_message, 7, 0)
+
+
+def test_build_context_respects_max_messages():
+    history = [message(f"message {i}") for i in range(10)]
+    
+    window = build_context(history, max_tokens=10_000, max_messages=2)
+    
+    assert [m["content"] for m in window.messages] == ["message 8", "message 9"]
+    assert window.dropped == 8
+
+
+def test_build_context_truncates_oversized_and_oldest_messages():
+    history = [
+        message("old " * 100),
+        message("x" * 5000, role="assistant"),
+        message("where is my order?")
+    ]
+    
+    window = build_context(history, max_tokens=60, max_message_tokens=20)
+    
+    old, long, newest = window.messages
+    assert newest["content"] == "where is my order?"
+    # Cut to max_message_tokens, not dropped for its single huge piece
+    assert long["role"] == "assistant" and long["content"].startswith("xxxx")
+    assert count_tokens(long["content"]) <= 20
+    # The oldest message gets the space that is left
+    assert old["content"].startswith("old old") and old["content"].endswith(TRUNCATION_MARKER)
+    assert window.truncated == 2
+    assert window.tokens_used <= 60
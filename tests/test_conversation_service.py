@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.common import MessageRole
+from app.services.conversation_service import ConversationNotFoundError, ConversationService
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Returns the given rows for every statement; records SQL and commits"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+        self.sql = []
+        self.commits = 0
+    
+    async def execute(self, stmt):
+        self.sql.append(str(stmt.compile(dialect=postgresql.asyncpg.dialect())))
+        return FakeResult(self.rows)
+    
+    async def commit(self):
+        self.commits += 1
+
+
+TURN = [
+    {"role": MessageRole.USER, "content": "where is my order"},
+    {"role": MessageRole.ASSISTANT, "content": "It has shipped", "agent_type": None}
+]
+
+
+@pytest.mark.anyio
+async def test_record_turn_inserts_through_the_conversation_update():
+    conversation_id = str(uuid.uuid4())
+    db = FakeSession([("id-1",), ("id-2",)])
+    
+    ids = await ConversationService(db).record_turn(conversation_id, TURN)
+    
+    assert len(ids) == 2
+    assert db.commits == 1
+    [sql] = db.sql
+    assert "conversations.status != " in sql
+    # The messages come from the UPDATE's RETURNING, one row per message
+    assert sql.count("FROM updated_conversation") == 2
+
+
+@pytest.mark.anyio
+async def test_record_turn_writes_nothing_for_a_deleted_conversation():
+    db = FakeSession([])
+    
+    with pytest.raises(ConversationNotFoundError):
+        await ConversationService(db).record_turn(str(uuid.uuid4()), TURN)
+    
+    assert db.commits == 0
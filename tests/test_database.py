@@ -0,0 +1,47 @@
+import pytest
+
+import app.core.database as database
+from app.core.config import settings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A configured replica, with sessions labelled by where they go"""
+    clock = FakeClock()
+    monkeypatch.setattr(database, "time", clock)
+    monkeypatch.setattr(database, "read_engine", object())
+    monkeypatch.setattr(database, "_recent_writes", {})
+    monkeypatch.setattr(database, "AsyncSessionLocal", lambda: "primary")
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", lambda: "replica")
+    return clock
+
+
+def test_reads_go_to_the_replica(replica):
+    assert database.read_session() == "replica"
+    assert database.read_session("conversation-1") == "replica"
+
+
+def test_reads_after_a_write_go_to_the_primary_until_replica_catches_up(replica):
+    database.mark_written("conversation-1")
+    
+    assert database.read_session("conversation-1") == "primary"
+    assert database.read_session("conversation-2") == "replica"
+    
+    replica.now += settings.READ_YOUR_WRITES_SECONDS + 0.1
+    assert database.read_session("conversation-1") == "replica"
+
+
+def test_no_write_tracking_without_a_replica(monkeypatch):
+    monkeypatch.setattr(database, "_recent_writes", {})
+    
+    database.mark_written("conversation-1")
+    
+    assert database._recent_writes == {}
@@ -0,0 +1,48 @@
+import pytest
+
+from app.services.fast_path import IntentExtractor
+
+
+ANSWERED = [
+    ("ORD-2024-002", "order_status", {"order_number": "ORD-2024-002"}),
+    ("order ORD-2024-002?", "order_status", {"order_number": "ORD-2024-002"}),
+    ("Where is my order ORD-2024-002?", "order_status", {"order_number": "ORD-2024-002"}),
+    ("when will ord-2024-002 arrive", "order_status", {"order_number": "ORD-2024-002"}),
+    ("What items are in ORD-2024-002", "order_details", {"order_number": "ORD-2024-002"}),
+    ("track TRK123456", "tracking_status", {"tracking_number": "TRK123456"}),
+    ("INV-2024-004", "invoice_details", {"invoice_number": "INV-2024-004"}),
+    ("Is INV-2024-004 paid?", "invoice_details", {"invoice_number": "INV-2024-004"}),
+    ("refund status for INV-2024-004", "refund_status", {"invoice_number": "INV-2024-004"}),
+]
+
+# Complaints, requests and negations need an agent
+FALLBACK = [
+    "ORD-2024-002 hasn't arrived yet",
+    "my order ORD-2024-002 still isn't here",
+    "I was charged twice for INV-2024-004",
+    "Is INV-2024-004 paid? I can't see it",
+    "can you resend the receipt for INV-2024-004",
+    "ORD-2024-002 doesnt show up",
+    "ORD-2024-002 says delivered but I don't have it",
+    "please cancel ORD-2024-002",
+    "I got the wrong item in ORD-2024-002",
+    "ORD-2024-002 arrived damaged",
+    "thinking about ORD-2024-002",
+    "status of ORD-2024-002 and ORD-2024-003",
+    "where is my order",
+    "refund for ORD-2024-002",
+]
+
+
+@pytest.mark.parametrize("message,name,arguments", ANSWERED)
+def test_lookup_is_answered(message, name, arguments):
+    intent = IntentExtractor().extract(message)
+    
+    assert intent is not None
+    assert intent.name == name
+    assert intent.arguments == arguments
+
+
+@pytest.mark.parametrize("message", FALLBACK)
+def test_falls_back_to_agents(message):
+    assert IntentExtractor().extract(message) is None
@@ -0,0 +1,140 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.core.history_cache as history_cache_module
+from app.core.config import settings
+from app.core.history_cache import HistoryCache, history_cache
+from app.schemas.common import MessageRole
+from app.services.conversation_service import ConversationService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(history_cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(clock):
+    return HistoryCache(max_bytes=10_000, max_messages=3)
+
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+def rows(*contents, start=START):
+    """One user message a minute after start"""
+    return [
+        (MessageRole.USER, content, start + timedelta(minutes=i + 1))
+        for i, content in enumerate(contents)
+    ]
+
+
+def contents(result):
+    return [content for _, content in result]
+
+
+def test_complete_entry_answers_for_after_at_or_above_its_floor(cache):
+    cache.put("c1", rows("a", "b"), floor=START, complete=True)
+    
+    assert contents(cache.get("c1", limit=10, after=START)) == ["a", "b"]
+    assert contents(cache.get("c1", limit=10, after=START + timedelta(minutes=1))) == ["b"]
+    # Older messages may exist below the floor
+    assert cache.get("c1", limit=10, after=START - timedelta(minutes=1)) is None
+    assert cache.get("c1", limit=10) is None
+    assert cache.get("c2", limit=10) is None
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_incomplete_entry_misses_when_more_rows_are_asked_for(cache):
+    cache.put("c1", rows("a", "b"), floor=None, complete=False)
+    
+    assert cache.get("c1", limit=3) is None
+    assert contents(cache.get("c1", limit=2)) == ["a", "b"]
+    assert contents(cache.get("c1", limit=1)) == ["b"]
+
+
+def test_append_past_max_messages_clears_complete(cache):
+    cache.put("c1", rows("a", "b"), floor=None, complete=True)
+    assert contents(cache.get("c1", limit=10)) == ["a", "b"]
+    
+    cache.append("c1", rows("c", "d", start=START + timedelta(hours=1)))
+    
+    # "a" was dropped, so the cache can no longer answer for everything
+    assert cache.get("c1", limit=10) is None
+    assert contents(cache.get("c1", limit=3)) == ["b", "c", "d"]
+    assert cache.stats()["bytes"] == sum(len(c) + history_cache_module.ROW_OVERHEAD_BYTES for c in "bcd")
+
+
+def test_append_to_uncached_conversation_is_ignored(cache):
+    cache.append("c1", rows("a"))
+    
+    assert cache.stats()["conversations"] == 0
+
+
+def test_least_recently_used_conversation_is_evicted_at_the_byte_limit(clock):
+    # Room for two single-message conversations
+    cache = HistoryCache(max_bytes=2 * (history_cache_module.ROW_OVERHEAD_BYTES + 1), max_messages=3)
+    cache.put("c1", rows("a"), floor=None, complete=True)
+    cache.put("c2", rows("b"), floor=None, complete=True)
+    assert cache.get("c1", limit=10)
+    
+    cache.put("c3", rows("c"), floor=None, complete=True)
+    
+    assert cache.get("c2", limit=10) is None
+    assert cache.get("c1", limit=10) and cache.get("c3", limit=10)
+    assert cache.stats()["evictions"] == 1
+    assert cache.total_bytes == cache.max_bytes
+    
+    # An entry larger than the whole cache is not stored at all
+    cache.put("c4", rows("x" * cache.max_bytes), floor=None, complete=True)
+    assert cache.get("c4", limit=10) is None
+    assert cache.stats()["conversations"] == 2
+
+
+def test_expired_entry_misses_and_is_dropped(cache, clock):
+    cache.put("c1", rows("a"), floor=None, complete=True)
+    clock.now += settings.HISTORY_CACHE_TTL_SECONDS + 1
+    
+    assert cache.get("c1", limit=10) is None
+    assert cache.stats()["conversations"] == 0
+    assert cache.total_bytes == 0
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+    
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    async def execute(self, stmt):
+        return FakeResult("deleted-id")
+    
+    async def commit(self):
+        pass
+
+
+@pytest.mark.anyio
+async def test_delete_conversation_invalidates_its_history():
+    conversation_id = str(uuid.uuid4())
+    history_cache.put(conversation_id, rows("a"), floor=None, complete=True)
+    
+    try:
+        assert await ConversationService(FakeSession()).delete_conversation(conversation_id)
+        assert history_cache.get(conversation_id, limit=10) is None
+    finally:
+        history_cache.invalidate(conversation_id)
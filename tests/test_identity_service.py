@@ -0,0 +1,46 @@
+import pytest
+
+import app.services.identity_service as identity_service
+from app.services.identity_service import IdentityCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(identity_service, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(clock):
+    return IdentityCache(max_entries=2, ttl_seconds=60)
+
+
+def test_least_recently_used_entry_is_evicted_at_the_cap(cache):
+    cache.set("id:a", "a")
+    cache.set("id:b", "b")
+    assert cache.get("id:a") == "a"
+    
+    cache.set("id:c", "c")
+    
+    assert len(cache._entries) == 2
+    assert cache.get("id:b") is None
+    assert cache.get("id:a") == "a"
+    assert cache.get("id:c") == "c"
+
+
+def test_expired_entry_is_deleted(cache, clock):
+    cache.set("default", "a")
+    clock.now += 61
+    
+    assert cache.get("default") is None
+    assert "default" not in cache._entries
+    assert (cache.hits, cache.misses) == (0, 1)
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import train_router
+from app.agents.intent_classifier import IntentClassifier
+
+
+CORPUS = [
+    ("where is my order ORD-2024-001", "order"),
+    ("track my package please", "order"),
+    ("when will my delivery arrive", "order"),
+    ("I want a refund for INV-2024-001", "billing"),
+    ("why was my card charged twice", "billing"),
+    ("send me my invoice", "billing"),
+    ("how do I reset my password", "support"),
+    ("I can't log in to my account", "support"),
+    ("what is your return policy", "support")
+]
+
+
+def train(corpus=CORPUS, **kwargs):
+    return IntentClassifier.train([text for text, _ in corpus], [label for _, label in corpus], **kwargs)
+
+
+def test_predicts_the_closest_agent():
+    classifier = train()
+    
+    agent, confidence = classifier.predict("has my package been delivered")
+    
+    assert agent == "order"
+    assert 0 < confidence <= 1
+
+
+def test_single_label_corpus_is_rejected():
+    corpus = [(text, "support") for text, _ in CORPUS]
+    
+    with pytest.raises(ValueError, match="at least two agents"):
+        train(corpus)
+
+
+def test_required_label_below_minimum_is_rejected():
+    corpus = [example for example in CORPUS if example[1] != "billing"]
+    
+    with pytest.raises(ValueError, match="'billing': 0"):
+        train(corpus, required_labels=["billing", "order", "support"], min_per_label=3)
+    with pytest.raises(ValueError, match="'order': 3"):
+        train(CORPUS, required_labels=["billing", "order", "support"], min_per_label=4)
+    
+    assert train(CORPUS, required_labels=["billing", "order", "support"], min_per_label=3)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    classifier = train()
+    path = str(tmp_path / "router.npz")
+    
+    classifier.save(path)
+    loaded = IntentClassifier.load(path)
+    
+    assert loaded.labels == ["billing", "order", "support"]
+    assert loaded.predict("send me my invoice") == classifier.predict("send me my invoice")
+
+
+def test_examples_skip_error_replies_and_deleted_conversations():
+    sql = str(train_router.examples_query().compile(dialect=postgresql.asyncpg.dialect()))
+    
+    assert "JOIN conversations" in sql
+    assert "conversations.status !=" in sql
+    assert "next_content NOT LIKE" in sql
+    assert "IS DISTINCT FROM" in sql
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app.core.llm_cache as llm_cache
+from app.agents.base_agent import TokenBudget
+from app.core.llm_cache import CachedAIClient, CompletionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+class FakeCompletions:
+    """Answers every call with a new response reporting 10 + 5 tokens"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        return SimpleNamespace(id=f"response-{self.calls}", usage=usage)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def client(clock):
+    completions = FakeCompletions()
+    return CachedAIClient(SimpleNamespace(chat=SimpleNamespace(completions=completions)), CompletionCache(2, 60))
+
+
+REQUEST = {
+    "model": "gpt-test",
+    "messages": [{"role": "user", "content": "what is your return policy?"}],
+    "temperature": 0.7,
+    "max_tokens": 500
+}
+
+
+def create(client, **overrides):
+    return client.chat.completions.create(**{**REQUEST, **overrides})
+
+
+def test_key_is_stable_and_ignores_transport_arguments():
+    key = CompletionCache.make_key(**REQUEST)
+    
+    assert key == CompletionCache.make_key(**dict(reversed(list(REQUEST.items()))))
+    assert key == CompletionCache.make_key(**REQUEST, hedge=True, timeout=5)
+    assert key != CompletionCache.make_key(**{**REQUEST, "temperature": 0.2})
+    assert key != CompletionCache.make_key(**{**REQUEST, "messages": [{"role": "user", "content": "hi"}]})
+
+
+@pytest.mark.anyio
+async def test_hit_returns_cached_response_with_zero_usage(client):
+    budget = TokenBudget()
+    
+    first = await create(client)
+    budget.add(first.usage)
+    second = await create(client)
+    budget.add(second.usage)
+    
+    assert second.id == first.id == "response-1"
+    assert budget.total_tokens == 15
+    # The stored response keeps its usage for later hits
+    assert first.usage.total_tokens == 15
+    assert client.cache.stats()["hits"] == 1
+    assert client.cache.stats()["misses"] == 1
+
+
+@pytest.mark.anyio
+async def test_cache_false_and_streams_bypass_the_cache(client):
+    await create(client)
+    
+    assert (await create(client, cache=False)).id == "response-2"
+    assert (await create(client, stream=True)).id == "response-3"
+    assert client.cache.stats()["entries"] == 1
+    assert (client.cache.hits, client.cache.misses) == (0, 1)
+
+
+@pytest.mark.anyio
+async def test_expired_entry_is_fetched_again(client, clock):
+    await create(client)
+    clock.now += 61
+    
+    assert (await create(client)).id == "response-2"
+    assert client.cache.stats()["misses"] == 2
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_entry_is_evicted(client):
+    await create(client, temperature=0.1)
+    await create(client, temperature=0.2)
+    await create(client, temperature=0.1)
+    
+    await create(client, temperature=0.3)
+    
+    assert client.cache.stats()["evictions"] == 1
+    assert (await create(client, temperature=0.1)).id == "response-1"
+    assert (await create(client, temperature=0.2)).id == "response-4"
+    assert client.cache.stats()["hit_rate"] == round(2 / 6, 4)
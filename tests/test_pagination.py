@@ -0,0 +1,84 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.conversation_service import ConversationService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+UPDATED_AT = datetime(2024, 5, 1, 12, 30, 15, 123456)
+CONVERSATION_ID = uuid.UUID("6f1c2e7a-1b7e-4a55-9d8e-2f0c8b7a9e31")
+
+
+class FakeSession:
+    """Records the SQL of every statement and returns no rows"""
+    
+    def __init__(self):
+        self.sql = []
+    
+    async def execute(self, stmt):
+        self.sql.append(str(stmt.compile(dialect=postgresql.asyncpg.dialect())))
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: []))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(UPDATED_AT, CONVERSATION_ID)
+    
+    assert decode_cursor(cursor) == (UPDATED_AT, CONVERSATION_ID)
+    # Safe in a query string as is
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    encode_cursor(UPDATED_AT, CONVERSATION_ID)[:-4],
+    "eyJpZCI6ICJ4In0",  # {"id": "x"}, no updated_at
+    "eyJ1cGRhdGVkX2F0IjogIjIwMjQtMDUtMDEiLCAiaWQiOiAieCJ9",  # id "x" isn't a UUID
+])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_next_cursor_points_past_the_last_row():
+    conversations = [
+        SimpleNamespace(updated_at=datetime(2024, 5, 2), id=uuid.uuid4()),
+        SimpleNamespace(updated_at=UPDATED_AT, id=CONVERSATION_ID)
+    ]
+    
+    assert decode_cursor(ConversationService.next_cursor(conversations, limit=2)) == (
+        UPDATED_AT, CONVERSATION_ID
+    )
+    # A short page is the last one
+    assert ConversationService.next_cursor(conversations, limit=3) is None
+
+
+@pytest.mark.anyio
+async def test_cursor_pages_by_keyset_instead_of_offset():
+    db = FakeSession()
+    service = ConversationService(db)
+    
+    await service.get_user_conversations("user", limit=20, offset=40)
+    await service.get_user_conversations(
+        "user", limit=20, offset=40, cursor=encode_cursor(UPDATED_AT, CONVERSATION_ID)
+    )
+    
+    offset_sql, keyset_sql = db.sql
+    assert "OFFSET" in offset_sql
+    assert "OFFSET" not in keyset_sql
+    assert "(conversations.updated_at, conversations.id) < (" in keyset_sql
+    assert "ORDER BY conversations.updated_at DESC, conversations.id DESC" in keyset_sql
+
+
+@pytest.mark.anyio
+async def test_malformed_cursor_is_rejected_before_querying():
+    db = FakeSession()
+    
+    with pytest.raises(ValueError):
+        await ConversationService(db).get_user_conversations("user", cursor="not a cursor")
+    
+    assert db.sql == []
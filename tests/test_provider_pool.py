@@ -0,0 +1,305 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import app.core.provider_pool as provider_pool
+from app.core.config import settings
+from app.core.provider_pool import Provider, ProviderPool
+
+
+REQUEST = httpx.Request("POST", "https://llm.test/v1/chat/completions")
+
+
+def connection_error():
+    return openai.APIConnectionError(request=REQUEST)
+
+
+def status_error(error_class, status_code, headers=None):
+    response = httpx.Response(status_code, headers=headers, request=REQUEST)
+    return error_class("Provider error", response=response, body=None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+class FakeClient:
+    """
+    chat.completions.create() that answers after latency seconds of the
+    fake clock, or raises the next scripted error.
+    """
+    
+    def __init__(self, clock, latency=0.1, errors=()):
+        self.clock = clock
+        self.latency = latency
+        self.errors = list(errors)
+        self.models = []
+        self.chat = SimpleNamespace(completions=self)
+    
+    async def create(self, **kwargs):
+        self.models.append(kwargs["model"])
+        self.clock.now += self.latency
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(model=kwargs["model"])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(provider_pool, "time", clock)
+    return clock
+
+
+def make_pool(*clients, failover=True):
+    return ProviderPool(
+        [Provider(f"provider-{i}", client, f"model-{i}") for i, client in enumerate(clients)],
+        failover=failover
+    )
+
+
+def names(providers):
+    return [provider.name for provider in providers]
+
+
+@pytest.mark.anyio
+async def test_fails_over_to_next_provider_with_its_model(clock):
+    first = FakeClient(clock, errors=[connection_error()])
+    second = FakeClient(clock)
+    pool = make_pool(first, second)
+    
+    response = await pool.chat.completions.create(model="ignored", messages=[])
+    
+    assert response.model == "model-1"
+    assert first.models == ["model-0"]
+    assert pool.failovers == 1
+    assert pool.providers[0].health.failures == 1
+
+
+@pytest.mark.anyio
+async def test_client_errors_do_not_fail_over(clock):
+    first = FakeClient(clock, errors=[status_error(openai.BadRequestError, 400)])
+    second = FakeClient(clock)
+    pool = make_pool(first, second)
+    
+    with pytest.raises(openai.BadRequestError):
+        await pool.chat.completions.create(model="ignored", messages=[])
+    
+    assert second.models == []
+
+
+@pytest.mark.anyio
+async def test_last_error_raised_when_every_provider_fails(clock):
+    pool = make_pool(
+        FakeClient(clock, errors=[connection_error()]),
+        FakeClient(clock, errors=[status_error(openai.InternalServerError, 503)])
+    )
+    
+    with pytest.raises(openai.InternalServerError):
+        await pool.chat.completions.create(model="ignored", messages=[])
+
+
+@pytest.mark.anyio
+async def test_repeated_failures_cool_provider_down(clock):
+    threshold = settings.AI_PROVIDER_FAILURE_THRESHOLD
+    first = FakeClient(clock, latency=0.1, errors=[connection_error() for _ in range(threshold)])
+    pool = make_pool(first, FakeClient(clock, latency=2.0))
+    pool.providers[0].health.record_success(0.1)
+    pool.providers[1].health.record_success(2.0)
+    
+    for _ in range(threshold - 1):
+        await pool.chat.completions.create(model="ignored", messages=[])
+        # Still the faster one despite the errors
+        assert names(pool.ranked()) == ["provider-0", "provider-1"]
+    
+    await pool.chat.completions.create(model="ignored", messages=[])
+    assert pool.providers[0].health.cooling_down(clock.now)
+    assert names(pool.ranked()) == ["provider-1", "provider-0"]
+    assert len(first.models) == threshold
+    
+    clock.now += settings.AI_PROVIDER_COOLDOWN_SECONDS
+    assert names(pool.ranked()) == ["provider-0", "provider-1"]
+
+
+@pytest.mark.anyio
+async def test_rate_limit_cools_down_for_retry_after(clock):
+    first = FakeClient(clock, latency=0.0, errors=[
+        status_error(openai.RateLimitError, 429, headers={"retry-after": "7"})
+    ])
+    pool = make_pool(first, FakeClient(clock, latency=0.0))
+    
+    await pool.chat.completions.create(model="ignored", messages=[])
+    
+    assert pool.providers[0].health.cooldown_until == pytest.approx(clock.now + 7)
+    assert names(pool.ranked()) == ["provider-1", "provider-0"]
+
+
+@pytest.mark.anyio
+async def test_prefers_faster_provider_once_measured(clock):
+    slow = FakeClient(clock, latency=2.0)
+    fast = FakeClient(clock, latency=0.2)
+    pool = make_pool(slow, fast)
+    
+    # Unmeasured providers are probed first, in preference order
+    await pool.chat.completions.create(model="ignored", messages=[])
+    await pool.chat.completions.create(model="ignored", messages=[])
+    await pool.chat.completions.create(model="ignored", messages=[])
+    
+    assert slow.models == ["model-0"]
+    assert fast.models == ["model-1", "model-1"]
+
+
+def test_stale_stats_are_forgotten(clock):
+    pool = make_pool(FakeClient(clock), FakeClient(clock))
+    pool.providers[0].health.record_success(5.0)
+    pool.providers[1].health.record_success(1.0)
+    assert names(pool.ranked()) == ["provider-1", "provider-0"]
+    
+    clock.now += settings.AI_PROVIDER_STATS_WINDOW_SECONDS + 1
+    
+    assert names(pool.ranked()) == ["provider-0", "provider-1"]
+    assert pool.providers[0].health.latency is None
+
+
+@pytest.mark.anyio
+async def test_failover_disabled_uses_first_provider_only(clock):
+    second = FakeClient(clock)
+    pool = make_pool(FakeClient(clock, errors=[connection_error()]), second, failover=False)
+    
+    with pytest.raises(openai.APIConnectionError):
+        await pool.chat.completions.create(model="ignored", messages=[])
+    
+    assert second.models == []
+
+
+class SleepingClient:
+    """Answers after sleeping delay seconds of real time"""
+    
+    def __init__(self, delay, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.chat = SimpleNamespace(completions=self)
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return SimpleNamespace(model=kwargs["model"])
+
+
+@pytest.fixture
+def hedging(monkeypatch, clock):
+    monkeypatch.setattr(settings, "AI_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "AI_HEDGE_MAX_RATE", 0.25)
+
+
+def hedging_pool(*clients):
+    pool = make_pool(*clients)
+    for provider in pool.providers:
+        # Recent latency well below the slow clients' delay
+        for _ in range(settings.AI_HEDGE_MIN_SAMPLES):
+            provider.health.record_success(0.001)
+    return pool
+
+
+async def hedged_call(pool, **kwargs):
+    return await pool.chat.completions.create(hedge=True, model="ignored", messages=[], **kwargs)
+
+
+@pytest.mark.anyio
+async def test_slow_call_is_hedged_on_next_provider(hedging):
+    slow, fast = SleepingClient(0.5), SleepingClient(0.0)
+    pool = hedging_pool(slow, fast)
+    pool._hedge_budget = 1.0
+    
+    response = await hedged_call(pool)
+    await asyncio.sleep(0)
+    
+    assert response.model == "model-1"
+    assert (pool.hedged, pool.hedge_wins) == (1, 1)
+    # The losing call is cancelled rather than left running
+    assert slow.cancelled == 1
+    assert pool.providers[0].health.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_fast_call_is_not_hedged(hedging):
+    second = SleepingClient(0.0)
+    pool = hedging_pool(SleepingClient(0.0), second)
+    pool._hedge_budget = 1.0
+    
+    await hedged_call(pool)
+    
+    assert pool.hedgeable == 1
+    assert pool.hedged == 0
+    assert second.calls == 0
+
+
+@pytest.mark.anyio
+async def test_no_hedge_without_enough_samples_or_for_streams(hedging):
+    second = SleepingClient(0.0)
+    pool = make_pool(SleepingClient(0.05), second)
+    pool._hedge_budget = 1.0
+    
+    await hedged_call(pool)
+    
+    pool = hedging_pool(SleepingClient(0.05), second)
+    pool._hedge_budget = 1.0
+    await hedged_call(pool, stream=True)
+    
+    assert second.calls == 0
+
+
+@pytest.mark.anyio
+async def test_hedge_rate_is_limited_by_token_bucket(hedging):
+    pool = hedging_pool(SleepingClient(0.05), SleepingClient(0.0))
+    
+    for _ in range(8):
+        await hedged_call(pool)
+    
+    # AI_HEDGE_MAX_RATE = 0.25, one hedge per four hedgeable calls
+    assert pool.hedgeable == 8
+    assert pool.hedged == 2
+
+
+@pytest.mark.anyio
+async def test_unused_hedge_budget_is_capped(hedging):
+    fast = SleepingClient(0.0)
+    pool = hedging_pool(fast, SleepingClient(0.0))
+    for _ in range(40):
+        await hedged_call(pool)
+    assert pool._hedge_budget == provider_pool.HEDGE_BURST
+    
+    fast.delay = 0.05
+    for _ in range(8):
+        await hedged_call(pool)
+    
+    # Budget 5 plus 0.25 a call: hedges until it drops below one
+    assert pool.hedged == 6
+
+
+@pytest.mark.anyio
+async def test_hedge_failure_falls_back_to_primary(hedging):
+    pool = hedging_pool(SleepingClient(0.1), SleepingClient(0.0, error=connection_error()))
+    pool._hedge_budget = 1.0
+    
+    response = await hedged_call(pool)
+    
+    assert response.model == "model-0"
+    assert (pool.hedged, pool.hedge_wins) == (1, 0)
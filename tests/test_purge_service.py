@@ -0,0 +1,127 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.purge_service as purge_service
+from app.schemas.common import ConversationStatus
+from app.services.purge_service import ConversationPurger
+
+
+class FakeDatabase:
+    """
+    In-memory conversations and messages behind the purger's three
+    statements; the batch sizes are the ones the purger was built with.
+    """
+    
+    def __init__(self, purger):
+        self.purger = purger
+        self.conversations = {}
+        self.messages = {}
+        self.sessions = 0
+        # Rows deleted by each transaction
+        self.transactions = [0]
+    
+    def add(self, status, message_count):
+        conversation_id = uuid.uuid4()
+        self.conversations[conversation_id] = status
+        for _ in range(message_count):
+            self.messages[uuid.uuid4()] = conversation_id
+        return conversation_id
+    
+    def session(self):
+        self.sessions += 1
+        return FakeSession(self)
+    
+    def execute(self, stmt):
+        if stmt.is_select:
+            deleted = [
+                conversation_id for conversation_id, status in self.conversations.items()
+                if status == ConversationStatus.DELETED
+            ]
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(
+                all=lambda: deleted[:self.purger.conversation_batch_size]
+            ))
+        
+        ids = set(stmt.compile().params["conversation_ids"])
+        if stmt.table.name == "messages":
+            batch = [
+                message_id for message_id, conversation_id in self.messages.items()
+                if conversation_id in ids
+            ][:self.purger.message_batch_size]
+            for message_id in batch:
+                del self.messages[message_id]
+            self.transactions[-1] += len(batch)
+            return SimpleNamespace(rowcount=len(batch))
+        
+        # Messages first, the foreign key would refuse otherwise
+        assert not any(conversation_id in ids for conversation_id in self.messages.values())
+        for conversation_id in ids:
+            del self.conversations[conversation_id]
+        self.transactions[-1] += len(ids)
+        return SimpleNamespace(rowcount=len(ids))
+
+
+class FakeSession:
+    def __init__(self, database):
+        self.database = database
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def execute(self, stmt):
+        return self.database.execute(stmt)
+    
+    async def commit(self):
+        self.database.transactions.append(0)
+
+
+@pytest.fixture
+def purger():
+    return ConversationPurger(conversation_batch_size=2, message_batch_size=3)
+
+
+@pytest.fixture
+def database(purger, monkeypatch):
+    database = FakeDatabase(purger)
+    monkeypatch.setattr(purge_service, "AsyncSessionLocal", database.session)
+    return database
+
+
+@pytest.mark.anyio
+async def test_purges_deleted_conversations_in_batches(purger, database):
+    active = database.add(ConversationStatus.ACTIVE, 4)
+    for message_count in (7, 2, 0):
+        database.add(ConversationStatus.DELETED, message_count)
+    
+    assert await purger.purge() == 3
+    
+    assert database.conversations == {active: ConversationStatus.ACTIVE}
+    assert sorted(set(database.messages.values())) == [active]
+    assert len(database.messages) == 4
+    # Two conversation batches, then one session finding nothing left
+    assert database.sessions == 3
+
+
+@pytest.mark.anyio
+async def test_every_transaction_stays_within_the_batch_sizes(purger, database):
+    database.add(ConversationStatus.DELETED, 10)
+    database.add(ConversationStatus.DELETED, 5)
+    
+    await purger.purge()
+    
+    limit = max(purger.message_batch_size, purger.conversation_batch_size)
+    assert max(database.transactions) <= limit
+    # 15 messages in batches of 3, then the conversations
+    assert [rows for rows in database.transactions if rows] == [3, 3, 3, 3, 3, 2]
+
+
+@pytest.mark.anyio
+async def test_nothing_to_purge(purger, database):
+    database.add(ConversationStatus.ACTIVE, 2)
+    
+    assert await purger.purge() == 0
+    assert len(database.messages) == 2
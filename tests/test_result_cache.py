@@ -0,0 +1,135 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.tools.loaders as loaders
+import app.tools.result_cache as result_cache
+from app.tools.order_tools import CancelOrderTool, FetchOrderDetailsTool
+from app.tools.result_cache import ToolResultCache, tool_result_cache
+from app.tools.tool_executor import ToolExecutor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def commit(self):
+        pass
+    
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(clock):
+    return ToolResultCache(max_entries=3, ttl_seconds=30)
+
+
+ORDER_1 = {"order_number": "ORD-2024-001"}
+ORDER_2 = {"order_number": "ORD-2024-002"}
+
+
+def test_invalidate_drops_every_result_of_the_tag(cache):
+    cache.set("fetch_order_details", ORDER_1, "details 1", tag="order_number:ORD-2024-001")
+    cache.set("check_delivery_status", ORDER_1, "status 1", tag="order_number:ORD-2024-001")
+    cache.set("fetch_order_details", ORDER_2, "details 2", tag="order_number:ORD-2024-002")
+    
+    cache.invalidate("order_number:ORD-2024-001")
+    
+    assert cache.get("fetch_order_details", ORDER_1) is None
+    assert cache.get("check_delivery_status", ORDER_1) is None
+    assert cache.get("fetch_order_details", ORDER_2) == "details 2"
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_expired_and_evicted_entries_leave_their_tag(cache, clock):
+    cache.set("fetch_order_details", ORDER_1, "details 1", tag="order_number:ORD-2024-001")
+    clock.now += 31
+    assert cache.get("fetch_order_details", ORDER_1) is None
+    
+    for number in range(4):
+        arguments = {"order_number": f"ORD-2024-10{number}"}
+        cache.set("fetch_order_details", arguments, number, tag=f"order_number:ORD-2024-10{number}")
+    
+    # Only live entries are indexed by tag
+    assert set(cache._tags) == {f"order_number:ORD-2024-10{number}" for number in (1, 2, 3)}
+    cache.invalidate("order_number:ORD-2024-001")
+    assert cache.stats()["invalidations"] == 0
+
+
+def test_overwrite_moves_the_entry_to_its_new_tag(cache):
+    cache.set("fetch_order_details", ORDER_1, "old", tag="order_number:ORD-2024-001")
+    cache.set("fetch_order_details", ORDER_1, "new", tag="order_number:ORD-2024-002")
+    
+    cache.invalidate("order_number:ORD-2024-001")
+    
+    assert cache.get("fetch_order_details", ORDER_1) == "new"
+
+
+@pytest.mark.anyio
+async def test_mutating_tool_invalidates_cached_reads(clock, monkeypatch):
+    tool_result_cache.clear()
+    statuses = {"ORD-2024-001": "pending"}
+    loads = []
+    
+    async def load_orders(order_numbers):
+        loads.extend(order_numbers)
+        return {number: SimpleNamespace(
+            order_number=number,
+            status=SimpleNamespace(value=statuses[number]),
+            items=[],
+            total_amount=10.0,
+            tracking_number=None
+        ) for number in order_numbers}
+    
+    class CancellingTool(CancelOrderTool):
+        async def execute(self, order_number, reason=None):
+            statuses[order_number] = "cancelled"
+            return await super().execute(order_number, reason)
+    
+    monkeypatch.setattr(loaders, "_load_orders", load_orders)
+    executor = ToolExecutor(
+        [FetchOrderDetailsTool(), CancellingTool()],
+        session_factory=lambda: FakeSession(),
+        read_session_factory=lambda key: FakeSession()
+    )
+    
+    def call(name):
+        return {"id": name, "function": {"name": name, "arguments": json.dumps(ORDER_1)}}
+    
+    async def status():
+        [message] = await executor.execute_all([call("fetch_order_details")])
+        return json.loads(message["content"])["data"]["status"]
+    
+    try:
+        with loaders.loader_scope():
+            assert await status() == "pending"
+            assert await status() == "pending"
+            assert loads == ["ORD-2024-001"]
+            
+            await executor.execute_all([call("cancel_order")])
+            
+            assert await status() == "cancelled"
+            assert loads == ["ORD-2024-001", "ORD-2024-001"]
+    finally:
+        tool_result_cache.clear()
+
@@ -0,0 +1,81 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.agents.router_agent as router_agent
+import app.services.routing_policy as routing_policy
+from app.agents.router_agent import RouterAgent
+from app.services.routing_policy import StickyRoutingPolicy
+
+
+class FakeClient:
+    """chat.completions.create() answering with the given content"""
+    
+    def __init__(self, content):
+        self.content = content
+        self.chat = SimpleNamespace(completions=self)
+    
+    async def create(self, **kwargs):
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setattr(routing_policy, "get_intent_classifier", lambda: None)
+    return StickyRoutingPolicy()
+
+
+def routing(**overrides):
+    return {"agent": "order", "confidence": 0.9, "sticky_turns": 0, **overrides}
+
+
+def test_confident_follow_up_is_reused(policy):
+    assert policy.should_reuse("and when will it arrive?", routing())
+
+
+def test_low_confidence_or_too_many_turns_is_not_reused(policy):
+    assert not policy.should_reuse("and when will it arrive?", routing(confidence=0.5))
+    assert not policy.should_reuse("and when will it arrive?", routing(sticky_turns=5))
+    assert not policy.should_reuse("and when will it arrive?", None)
+
+
+def test_topic_shift_is_not_reused(policy):
+    assert not policy.should_reuse("I need a refund for INV-2024-001", routing())
+
+
+@pytest.mark.parametrize("confidence", ["0.9", "high", None, [0.9], float("nan")])
+def test_malformed_confidence_is_parsed_or_not_reused(policy, confidence):
+    last_routing = routing(confidence=confidence)
+    
+    reused = policy.should_reuse("and when will it arrive?", last_routing)
+    
+    # A numeric string is still a confidence, anything else can't be trusted
+    assert reused == (confidence == "0.9")
+
+
+def test_missing_confidence_is_not_reused(policy):
+    last_routing = routing()
+    del last_routing["confidence"]
+    
+    assert not policy.should_reuse("and when will it arrive?", last_routing)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("confidence, expected", [
+    ("0.9", 0.9),
+    (1.7, 1.0),
+    (-2, 0.0),
+    ("very", 0.5),
+    (None, 0.5)
+])
+async def test_router_coerces_llm_confidence(monkeypatch, confidence, expected):
+    monkeypatch.setattr(router_agent, "get_intent_classifier", lambda: None)
+    router = RouterAgent()
+    router.ai_client = FakeClient(json.dumps({"agent": "order", "confidence": confidence}))
+    
+    result = await router.route("where is my order?")
+    
+    assert result["agent"] == "order"
+    assert result["confidence"] == expected
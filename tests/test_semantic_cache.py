@@ -0,0 +1,78 @@
+import pytest
+
+from app.core.config import settings
+from app.core.semantic_cache import SemanticCache
+
+
+# Questions that should share a cached answer
+PARAPHRASES = [
+    ("how do returns work", "return policy?"),
+    ("how do returns work", "how does the return process work"),
+    ("How do I reset my password?", "how can i reset my password"),
+    ("What is your refund policy", "how do refunds work"),
+    ("How do I reset my password", "password reset"),
+    ("how long does shipping take", "how long does it take to ship"),
+    ("Can I change my email address?", "how do I change my email address"),
+    ("where can I find my invoices", "where are my invoices"),
+    ("How do I cancel my subscription?", "I want to cancel my subscription"),
+    ("What payment methods do you accept?", "which payment methods are accepted"),
+    ("how do I delete my account", "delete account"),
+    ("I don't want to cancel", "I do not want to cancel"),
+    ("what are your business hours", "business hours"),
+]
+
+# Questions that look alike but need different answers
+NON_PARAPHRASES = [
+    ("I want to cancel my subscription", "I do not want to cancel my subscription"),
+    ("can I get a refund", "can I not get a refund"),
+    ("is shipping free", "is shipping not free"),
+    ("how do I reset my password", "how do I change my email"),
+    ("return policy", "return shipping label"),
+    ("how long does shipping take", "how long does delivery take"),
+    ("can I pay with paypal", "can I pay with credit card"),
+    ("how do I cancel my order", "how do I cancel my subscription"),
+    ("change my password", "change my email"),
+    ("how do I delete my account", "how do I create an account"),
+    ("can I return opened items", "can I return unopened items"),
+    ("refund to credit card", "refund to paypal"),
+]
+
+
+def make_cache() -> SemanticCache:
+    return SemanticCache(max_entries=10, threshold=settings.SEMANTIC_CACHE_THRESHOLD, dim=1024)
+
+
+@pytest.mark.parametrize("stored, asked", PARAPHRASES)
+def test_paraphrase_hits(stored, asked):
+    cache = make_cache()
+    cache.add(stored, "answer")
+    
+    entry = cache.lookup(asked)
+    
+    assert entry is not None
+    assert entry.similarity >= settings.SEMANTIC_CACHE_THRESHOLD
+
+
+@pytest.mark.parametrize("stored, asked", NON_PARAPHRASES)
+def test_non_paraphrase_misses(stored, asked):
+    cache = make_cache()
+    cache.add(stored, "answer")
+    
+    assert cache.lookup(asked) is None
+
+
+def test_picks_entry_with_matching_negation():
+    cache = make_cache()
+    cache.add("I want to cancel my subscription", "how to cancel")
+    cache.add("I do not want to cancel my subscription", "how to keep it")
+    
+    assert cache.lookup("I don't want to cancel my subscription").answer == "how to keep it"
+    assert cache.lookup("how can I cancel my subscription").answer == "how to cancel"
+
+
+def test_invalidated_entry_no_longer_matches():
+    cache = make_cache()
+    entry_id = cache.add("return policy", "30 days")
+    
+    assert cache.invalidate(entry_id)
+    assert cache.lookup("how do returns work") is None
@@ -0,0 +1,114 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.common import MessageRole
+from app.services.summary_service import SummaryService
+
+
+CountRow = namedtuple("CountRow", "message_count extra_data")
+MessageRow = namedtuple("MessageRow", "role content created_at")
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def one_or_none(self):
+        return self.rows[0] if self.rows else None
+    
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Answers queries in order; records statements, commits and LLM calls in order"""
+    
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.log = []
+    
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        self.log.append("execute")
+        return FakeResult(self.results.pop(0) if self.results else [])
+    
+    async def commit(self):
+        self.log.append("commit")
+
+
+class FakeAIClient:
+    def __init__(self, session: FakeSession):
+        self.calls = []
+        self.session = session
+        self.chat = SimpleNamespace(completions=self)
+    
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        self.session.log.append("llm")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" Summary "))])
+
+
+def messages(count):
+    start = datetime(2024, 1, 1)
+    return [
+        MessageRow(MessageRole.USER, f"message {i}", start + timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+
+def service(db):
+    summary_service = SummaryService(db)
+    summary_service.ai_client = FakeAIClient(db)
+    summary_service.patches = []
+    
+    async def update_extra_data(conversation_id, patch):
+        summary_service.patches.append(patch)
+    
+    summary_service.conversation_service.update_extra_data = update_extra_data
+    return summary_service
+
+
+@pytest.mark.anyio
+async def test_no_update_while_messages_fit_the_window():
+    db = FakeSession([CountRow(settings.MAX_CONTEXT_MESSAGES, {})])
+    summary_service = service(db)
+    
+    assert not await summary_service.update_summary("c1")
+    # Only the count was read
+    assert len(db.statements) == 1
+    assert not summary_service.ai_client.calls
+
+
+@pytest.mark.anyio
+async def test_update_counts_from_the_previous_summary():
+    previous = {"text": "Old", "summarized_until": datetime(2024, 1, 1).isoformat(), "message_count": 30}
+    db = FakeSession([CountRow(30 + settings.MAX_CONTEXT_MESSAGES, {"summary": previous})])
+    
+    assert not await service(db).update_summary("c1")
+
+
+@pytest.mark.anyio
+async def test_update_folds_messages_outside_the_window():
+    unsummarized = settings.MAX_CONTEXT_MESSAGES + 1
+    folded = messages(unsummarized - settings.SUMMARY_KEEP_RECENT)
+    db = FakeSession([CountRow(unsummarized, {})], folded)
+    summary_service = service(db)
+    
+    assert await summary_service.update_summary("c1")
+    
+    # Only the folded rows are asked for
+    load = db.statements[1]
+    assert load._limit_clause.value == len(folded)
+    # The read transaction ends before the LLM call
+    assert db.log == ["execute", "execute", "commit", "llm", "commit"]
+    
+    assert summary_service.patches == [{"summary": {
+        "text": "Summary",
+        "summarized_until": folded[-1].created_at.isoformat(),
+        "message_count": len(folded)
+    }}]
@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.tools.loaders as loaders
+from app.tools.order_tools import CancelOrderTool, FetchOrderDetailsTool
+from app.tools.result_cache import tool_result_cache
+from app.tools.tool_executor import ToolExecutor
+
+
+class FakeSession:
+    def __init__(self, opened):
+        opened.append(self)
+        self.commits = 0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def commit(self):
+        self.commits += 1
+    
+    async def rollback(self):
+        pass
+
+
+def call(name, **arguments):
+    return {"id": f"call_{name}", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+@pytest.fixture
+def opened():
+    tool_result_cache.clear()
+    yield []
+    tool_result_cache.clear()
+
+
+@pytest.fixture
+def executor(opened):
+    return ToolExecutor(
+        [FetchOrderDetailsTool(), CancelOrderTool()],
+        session_factory=lambda: FakeSession(opened),
+        read_session_factory=lambda key: FakeSession(opened)
+    )
+
+
+@pytest.mark.anyio
+async def test_loader_tools_get_no_session(executor, opened, monkeypatch):
+    batches = []
+    
+    async def load_orders(order_numbers):
+        batches.append(order_numbers)
+        return {number: SimpleNamespace(
+            order_number=number,
+            status=SimpleNamespace(value="shipped"),
+            items=[],
+            total_amount=10.0,
+            tracking_number="TRK123456"
+        ) for number in order_numbers}
+    
+    monkeypatch.setattr(loaders, "_load_orders", load_orders)
+    
+    with loaders.loader_scope():
+        messages = await executor.execute_all([
+            call("fetch_order_details", order_number="ORD-2024-001"),
+            call("fetch_order_details", order_number="ORD-2024-002")
+        ])
+    
+    assert all(json.loads(message["content"])["success"] for message in messages)
+    assert batches == [["ORD-2024-001", "ORD-2024-002"]]
+    assert opened == []
+
+
+@pytest.mark.anyio
+async def test_other_tools_run_in_their_own_session(executor, opened):
+    [message] = await executor.execute_all([call("cancel_order", order_number="ORD-2024-001")])
+    
+    assert json.loads(message["content"])["success"]
+    assert [session.commits for session in opened] == [1]
@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import random
+from sqlalchemy import func, not_, select
+
+from app.core.database import AsyncSessionLocal
+from app.core.config import settings
+from app.agents.intent_classifier import IntentClassifier
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.schemas.common import AgentType, ConversationStatus, MessageRole
+
+SPECIALISTS = {AgentType.SUPPORT, AgentType.ORDER, AgentType.BILLING}
+
+
+# Start of every error reply, for turns saved before replies carried extra_data
+ERROR_REPLY_PREFIX = "I apologize, but I encountered an error"
+
+
+def examples_query():
+    """
+    Pair every user message with the agent that answered it.
+
+    The label of a user message is the agent_type of the next message in
+    the same conversation, when that is a specialist's reply. Error
+    replies (the support fallback after a routing failure, or an agent's
+    own error) and deleted conversations are left out, they say nothing
+    about which agent a message belongs to.
+    """
+    def next_message(column):
+        return func.lead(column, type_=column.type).over(
+            partition_by=Message.conversation_id, order_by=Message.created_at
+        )
+
+    pairs = (
+        select(
+            Message.role.label("role"),
+            Message.content.label("content"),
+            next_message(Message.role).label("next_role"),
+            next_message(Message.agent_type).label("next_agent"),
+            next_message(Message.content).label("next_content"),
+            next_message(Message.extra_data).label("next_extra_data")
+        )
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(Conversation.status != ConversationStatus.DELETED)
+        .subquery()
+    )
+    next_extra_data = pairs.c.next_extra_data
+
+    return select(pairs.c.content, pairs.c.next_agent).where(
+        pairs.c.role == MessageRole.USER,
+        pairs.c.next_role == MessageRole.ASSISTANT,
+        pairs.c.next_agent.in_(SPECIALISTS),
+        not_(pairs.c.next_content.startswith(ERROR_REPLY_PREFIX)),
+        # ->> is NULL for replies saved without extra_data
+        next_extra_data["error"].as_string().is_(None),
+        next_extra_data["routing"]["reasoning"].as_string().is_distinct_from("Error fallback")
+    )
+
+
+async def load_examples():
+    """Labelled (message, agent) pairs, see examples_query()"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(examples_query())
+        return [(content, agent.value) for content, agent in result.all()]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Train the local router classifier")
+    parser.add_argument("--output", default=settings.ROUTER_CLASSIFIER_PATH)
+    parser.add_argument("--test-split", type=float, default=0.2)
+    parser.add_argument("--min-examples", type=int, default=30)
+    parser.add_argument("--min-per-agent", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("Loading labelled messages...\n")
+    examples = await load_examples()
+
+    if len(examples) < args.min_examples:
+        print(f"Only {len(examples)} labelled messages found, need {args.min_examples}.")
+        print("The LLM router keeps handling all traffic until there is more history.")
+        return
+
+    random.Random(args.seed).shuffle(examples)
+    split = int(len(examples) * (1 - args.test_split))
+    train, test = examples[:split], examples[split:]
+
+    counts = {}
+    for _, label in examples:
+        counts[label] = counts.get(label, 0) + 1
+    print(f"Examples: {len(examples)} ({len(train)} train / {len(test)} test)")
+    print(f"Labels: {counts}")
+
+    # Final model uses every example, checked before anything else is done
+    try:
+        classifier = IntentClassifier.train(
+            [text for text, _ in examples],
+            [label for _, label in examples],
+            required_labels=[agent.value for agent in SPECIALISTS],
+            min_per_label=args.min_per_agent
+        )
+    except ValueError as e:
+        print(f"Not training: {e}.")
+        print("The LLM router keeps handling all traffic until there is more history.")
+        return
+
+    print("\nHeld-out report:")
+    held_out = IntentClassifier.train(
+        [text for text, _ in train],
+        [label for _, label in train]
+    )
+    report = held_out.evaluate([text for text, _ in test], [label for _, label in test])
+    print(json.dumps(report, indent=2))
+
+    classifier.save(args.output)
+    print(f"\nModel saved to {args.output}")
+    print("Restart the API to load it.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())